@@ -10,7 +10,13 @@ from controller import user_api
 # common endpoint
 from controller import main
 
+# json encoder
+from json_encoder import AppJSONEncoder
+
 # database
+from shared import profile_cache
+from shared import catalog_cache
+from shared import token_cache
 from shared import db
 # from model import *
 
@@ -21,10 +27,14 @@ def init_app(test_config=None):
     # initialize apps
     app = Flask(__name__, instance_relative_config=False)
     app.config.from_object('config')
+    app.json_encoder = AppJSONEncoder
 
     # initialize extension
     # CORS(app, resources={r"/api/*": {"origins": "*"}})
     db.init_app(app)
+    token_cache.init_app(app, 'AUTH0_TOKEN_CACHE')
+    profile_cache.init_app(app, 'AUTH0_PROFILE_CACHE')
+    catalog_cache.init_app(app, 'CATALOG_CACHE')
     Migrate().init_app(app=app, db=db)
 
     # registering blueprint
@@ -0,0 +1,218 @@
+"""
+Local Auth0 stand-in
+
+offline replacement of Auth0 tenant serving jwks, oauth/token and /api/v2/users endpoint,
+used for running test and benchmark without network access or real Auth0 tenant.
+
+in-process usage (no socket involved, Auth0 traffic is routed to the stand-in directly)
+
+    auth0 = local_tenant()
+    auth0.install(app)
+    token = auth0.mint_token('auth0|my-user-id', USER_PERMISSIONS)
+
+standalone usage, for load testing server running in another process
+
+    $ python auth0_local.py 8080
+    $ export AUTH0_DOMAIN=http://127.0.0.1:8080/ AUTH0_API_AUDIENCE=http://127.0.0.1:8000/ AUTH0_AUTH_ALGORITHMS=RS256
+    $ curl -X POST http://127.0.0.1:8080/mint -d '{"sub": "auth0|my-user-id"}' -H 'Content-Type: application/json'
+"""
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib.parse import urlsplit
+from flask import Flask
+from flask import jsonify
+from flask import request
+from flask import abort
+from jose import jwt
+import requests
+import hashlib
+import base64
+import time
+import sys
+import rsa
+
+from controller.controller_helper.http_client import http_client
+
+DOMAIN = 'http://auth0.local/'
+AUDIENCE = 'http://127.0.0.1:8000/'
+SYSTEM_AUDIENCE = f'{DOMAIN}api/v2/'
+
+# role permission, same as README Auth0 config
+USER_PERMISSIONS = ['get:me', 'get:my-game', 'post:my-game', 'patch:my-game', 'delete:my-game']
+MANAGER_PERMISSIONS = ['get:user', 'get:user-info', 'get:user-game', 'post:game', 'post:vendor',
+                       'patch:game', 'patch:vendor', 'delete:game', 'delete:vendor']
+
+
+def _b64_int(value):
+    raw = value.to_bytes((value.bit_length() + 7) // 8, 'big')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+class LocalAuth0:
+    """
+    Local Auth0 tenant
+
+    in-memory Auth0 tenant with its own signing key, users that is not registered
+    with add_user get generated profile so any token sub can be resolved.
+    """
+    def __init__(self, domain=DOMAIN, audience=AUDIENCE, key_size=2048):
+        public_key, private_key = rsa.newkeys(key_size)
+
+        self.domain = domain
+        self.audience = audience
+        self.private_key = private_key.save_pkcs1().decode()
+        self.kid = hashlib.sha256(str(public_key.n).encode()).hexdigest()[:16]
+        self.jwk = {
+            "kty": "RSA",
+            "kid": self.kid,
+            "use": "sig",
+            "alg": "RS256",
+            "n": _b64_int(public_key.n),
+            "e": _b64_int(public_key.e)
+        }
+        self.users = {}
+        # seconds oauth/token take to answer, to simulate slow token minting
+        self.token_latency = 0
+        self.app = self._create_app()
+
+    def add_user(self, user_id, username=None, email=None, picture=None, role='mgl_user'):
+        self.users[user_id] = {
+            "identities": [{"user_id": user_id.split('|', 1)[-1]}],
+            "nickname": username or user_id.split('|', 1)[-1],
+            "email": email or f"{user_id.split('|', 1)[-1]}@auth0.local",
+            "picture": picture or f"{self.domain}avatar/{user_id.split('|', 1)[-1]}.png",
+            "role": role
+        }
+        return self.users[user_id]
+
+    def get_user(self, user_id):
+        return self.users.get(user_id) or self.add_user(user_id)
+
+    def mint_token(self, sub, permissions=(), expires_in=3600, audience=None):
+        current_time = int(time.time())
+        claims = {
+            "iss": self.domain,
+            "sub": sub,
+            "aud": audience or self.audience,
+            "iat": current_time,
+            "exp": current_time + expires_in,
+            "permissions": list(permissions)
+        }
+        return jwt.encode(claims, self.private_key, algorithm='RS256', headers={"kid": self.kid})
+
+    def install(self, app):
+        """
+        point app Auth0 config to this stand-in, and route its Auth0 traffic in-process
+        """
+        app.config.update(
+            AUTH0_DOMAIN=self.domain,
+            AUTH0_API_AUDIENCE=self.audience,
+            AUTH0_SYSTEM_AUDIENCE=f'{self.domain}api/v2/',
+            AUTH0_ALGORITHMS=['RS256'],
+            AUTH0_CLIENT='local-client',
+            AUTH0_SECRET='local-secret',
+            AUTH0_GRANT_TYPE='client_credentials'
+        )
+        http_client.mount(self.domain, LocalAdapter(self.app))
+
+    def _create_app(self):
+        app = Flask('auth0_local')
+
+        @app.route('/.well-known/jwks.json')
+        def jwks():
+            return jsonify({"keys": [self.jwk]})
+
+        @app.route('/oauth/token', methods=['POST'])
+        def oauth_token():
+            client = request.form.get('client_id') or 'local-client'
+            audience = request.form.get('audience') or f'{self.domain}api/v2/'
+            time.sleep(self.token_latency)
+            return jsonify({
+                "access_token": self.mint_token(f'{client}@clients', expires_in=86400, audience=audience),
+                "token_type": "Bearer",
+                "expires_in": 86400
+            })
+
+        @app.route('/api/v2/users/<user_id>')
+        def user_detail(user_id):
+            self._check_management_token()
+            user = self.get_user(user_id)
+            return jsonify({key: value for key, value in user.items() if key != 'role'})
+
+        @app.route('/api/v2/users/<user_id>/roles')
+        def user_roles(user_id):
+            self._check_management_token()
+            return jsonify([{"name": self.get_user(user_id).get('role')}])
+
+        @app.route('/mint', methods=['POST'])
+        def mint():
+            body = request.get_json() or {}
+            if not body.get('sub'):
+                abort(422)
+
+            permissions = body.get('permissions', USER_PERMISSIONS)
+            return jsonify({"access_token": self.mint_token(body['sub'], permissions, body.get('expires_in', 3600))})
+
+        return app
+
+    def _check_management_token(self):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+
+        if scheme != 'Bearer':
+            abort(401)
+
+        # only management token minted by this tenant is accepted, as real Auth0 do
+        try:
+            jwt.decode(token, self.jwk, algorithms=['RS256'], audience=f'{self.domain}api/v2/', issuer=self.domain)
+
+        except jwt.JWTError:
+            abort(401)
+
+
+def local_tenant():
+    """
+    process-wide LocalAuth0 instance, signing key is generated once
+    """
+    global _local_tenant
+
+    if _local_tenant is None:
+        _local_tenant = LocalAuth0()
+
+    return _local_tenant
+
+
+_local_tenant = None
+
+
+class LocalAdapter(BaseAdapter):
+    """
+    requests transport adapter dispatching request to a flask app without network
+    """
+    def __init__(self, app):
+        super().__init__()
+        self.client = app.test_client(use_cookies=False)
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        local_response = self.client.open(url.path,
+                                          method=request.method,
+                                          query_string=url.query,
+                                          headers=dict(request.headers),
+                                          data=request.body)
+
+        response = requests.Response()
+        response.status_code = local_response.status_code
+        response.headers = CaseInsensitiveDict(local_response.headers)
+        response._content = local_response.get_data()
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    LocalAuth0(domain=f'http://127.0.0.1:{port}/').app.run(port=port, threaded=True)
@@ -0,0 +1,91 @@
+"""
+Cache helper
+"""
+from collections import OrderedDict
+import threading
+import time
+
+
+class LRUCache:
+    """
+    LRU cache
+
+    thread safe bounded cache with per key expiration time,
+    least recently used key is evicted first when cache is full.
+    key can be tagged, so group of keys can be invalidated at once.
+    """
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._tags = {}
+
+    def init_app(self, app, prefix):
+        self.maxsize = app.config.get(f'{prefix}_SIZE', self.maxsize)
+        self.ttl = app.config.get(f'{prefix}_TTL', self.ttl)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None:
+                return default
+
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None, expires_at=None, tags=()):
+        """
+        store value, expires_at (epoch time) take precedence over ttl (in seconds)
+        """
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = time.time() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (value, expires_at, tuple(tags))
+
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            while len(self._data) > self.maxsize:
+                self._remove(next(iter(self._data)))
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def invalidate(self, *tags):
+        """
+        remove every key tagged with any of tags
+        """
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+
+    def _remove(self, key):
+        entry = self._data.pop(key, None)
+
+        if entry is not None:
+            for tag in entry[2]:
+                keys = self._tags.get(tag)
+                keys.discard(key)
+
+                if not keys:
+                    del self._tags[tag]
+
+    def __len__(self):
+        return len(self._data)
@@ -7,6 +7,61 @@ import os
 
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# Auth0 JWKS cache config (in seconds)
+AUTH0_JWKS_TTL = int(os.environ.get('AUTH0_JWKS_TTL', 3600))
+AUTH0_JWKS_REFRESH_INTERVAL = int(os.environ.get('AUTH0_JWKS_REFRESH_INTERVAL', 30))
+
+# verified Auth0 token cache config (maximum cached token)
+AUTH0_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH0_TOKEN_CACHE_SIZE', 4096))
+
+# resolved user profile cache config (maximum cached user, and lifetime in seconds)
+AUTH0_PROFILE_CACHE_SIZE = int(os.environ.get('AUTH0_PROFILE_CACHE_SIZE', 4096))
+AUTH0_PROFILE_CACHE_TTL = int(os.environ.get('AUTH0_PROFILE_CACHE_TTL', 300))
+
+# Auth0 management token refreshed this many seconds before expiration
+AUTH0_TOKEN_REFRESH_MARGIN = int(os.environ.get('AUTH0_TOKEN_REFRESH_MARGIN', 300))
+# maximum time (in seconds) a worker wait for other worker minting management token
+AUTH0_TOKEN_LOCK_TIMEOUT = float(os.environ.get('AUTH0_TOKEN_LOCK_TIMEOUT', 10))
+
+# Auth0 HTTP client config (timeout in seconds)
+AUTH0_HTTP_POOL_SIZE = int(os.environ.get('AUTH0_HTTP_POOL_SIZE', 10))
+AUTH0_HTTP_CONNECT_TIMEOUT = float(os.environ.get('AUTH0_HTTP_CONNECT_TIMEOUT', 3.05))
+AUTH0_HTTP_READ_TIMEOUT = float(os.environ.get('AUTH0_HTTP_READ_TIMEOUT', 10))
+AUTH0_HTTP_RETRIES = int(os.environ.get('AUTH0_HTTP_RETRIES', 2))
+AUTH0_HTTP_BACKOFF = float(os.environ.get('AUTH0_HTTP_BACKOFF', 0.3))
+AUTH0_HTTP_WORKERS = int(os.environ.get('AUTH0_HTTP_WORKERS', 4))
+
+# public catalog cache config (maximum cached response, and lifetime in seconds)
+CATALOG_CACHE_SIZE = int(os.environ.get('CATALOG_CACHE_SIZE', 2048))
+CATALOG_CACHE_TTL = int(os.environ.get('CATALOG_CACHE_TTL', 60))
+# catalog version is reread from database at most once per this many seconds
+CATALOG_VERSION_TTL = float(os.environ.get('CATALOG_VERSION_TTL', 1))
+# maximum number of game embedded in one page of vendor detail
+VENDOR_GAMES_LIMIT = int(os.environ.get('VENDOR_GAMES_LIMIT', 50))
+# maximum number of id requested at once in batch get (?ids=)
+BATCH_MAX_IDS = int(os.environ.get('BATCH_MAX_IDS', 100))
+# type-ahead suggestion config (maximum suggestion, and index rebuild interval in seconds)
+SUGGEST_LIMIT = int(os.environ.get('SUGGEST_LIMIT', 10))
+SUGGEST_INDEX_TTL = int(os.environ.get('SUGGEST_INDEX_TTL', 300))
+# name is indexed in popularity order under its first SUGGEST_PREFIX_LENGTH characters, longer prefix
+# is matched against at most SUGGEST_MAX_CANDIDATES most popular name sharing those characters
+SUGGEST_PREFIX_LENGTH = int(os.environ.get('SUGGEST_PREFIX_LENGTH', 3))
+SUGGEST_MAX_CANDIDATES = int(os.environ.get('SUGGEST_MAX_CANDIDATES', 200))
+# leaderboard config (number of ranked game, and cache lifetime in seconds)
+LEADERBOARD_LIMIT = int(os.environ.get('LEADERBOARD_LIMIT', 10))
+LEADERBOARD_TTL = int(os.environ.get('LEADERBOARD_TTL', 30))
+# facet config (maximum value returned per facet, and maximum filtered game counted by narrowed facet)
+FACET_LIMIT = int(os.environ.get('FACET_LIMIT', 50))
+FACET_MAX_GAMES = int(os.environ.get('FACET_MAX_GAMES', 10000))
+# maximum number of matching game ranked by full-text search
+SEARCH_MAX_CANDIDATES = int(os.environ.get('SEARCH_MAX_CANDIDATES', 1000))
+# number of row fetched at once from server-side cursor by catalog export
+CATALOG_EXPORT_BATCH_SIZE = int(os.environ.get('CATALOG_EXPORT_BATCH_SIZE', 500))
+
+# json encoder (orjson or stdlib) and datetime format (http or iso)
+JSON_ENCODER = os.environ.get('JSON_ENCODER', 'orjson')
+JSON_DATETIME_FORMAT = os.environ.get('JSON_DATETIME_FORMAT', 'http')
+
 # secret key switcher
 
 if os.environ.get('FLASK_ENV') == 'development':
@@ -13,7 +13,7 @@ from markdown.extensions import codehilite
 from markdown import markdown
 
 from .controller_helper import Auth0Identifier
-from .controller_helper import Auth0Validator
+from .controller_helper import verified_token
 
 from model import User
 from shared import db
@@ -58,7 +58,7 @@ def get_token():
     if request.method == 'POST':
         try:
             token = request.get_json()['token']
-            auth0_validator = Auth0Validator(token).get('sub')
+            auth0_validator = verified_token(token).get('sub')
             auth0_user_object = Auth0Identifier(auth0_validator)
             auth0_user_id = auth0_user_object.get('user_id')
 
@@ -87,7 +87,7 @@ def get_token():
                     'user_status': 'create',
                     'literal_status': 'redirect',
                     'redirect': url_for('user_endpoint.user_index'),
-                    'user_level': local_user.role
+                    'user_level': user.role
                 })
 
         except KeyError:
@@ -5,13 +5,18 @@ from flask import jsonify
 from flask import request
 from flask import abort
 
+from .controller_helper import bump_catalog_version
+from .controller_helper import suggest_index
+from .controller_helper import page_or_cursor
+from .controller_helper import library_page
+from .controller_helper import RowSerializer
 from .controller_helper import authenticate
 from .controller_helper import authorize
 
 from model import Vendor
-from model import MyGame
 from model import Game
 from model import User
+from shared import db
 
 admin = Blueprint('admin_endpoint', __name__)
 ITEM_LIMIT = 10
@@ -19,6 +24,13 @@ ITEM_LIMIT = 10
 # set cors in blueprint level
 CORS(admin)
 
+# list response row shape, user_id must stay the first column (cursor key)
+USER_LIST_ROW = RowSerializer(
+    user_id=User.id,
+    user=User.username,
+    email=User.email,
+)
+
 
 # user management endpoint
 @admin.route('/api/users')
@@ -26,15 +38,14 @@ CORS(admin)
 @authorize(permission='get:user')
 @authorize(permission='get:user-game')
 def admin_get_user(user_id):
-    page = request.args.get('page', 1, type=int)
-    start = (page - 1) * ITEM_LIMIT
-    end = start + ITEM_LIMIT
-
-    users = User.query.all()
-    user = [{'user_id': user.id, 'user': user.username, 'email': user.email} for user in users]
+    # pylint: disable=maybe-no-member
+    users = db.session.query(*USER_LIST_ROW.columns)
+    users, cursor = page_or_cursor(users, [User.id], lambda x: [x[0]], ITEM_LIMIT)
+    user = USER_LIST_ROW.dump_all(users)
 
     return jsonify({
-        'users': user[start:end]
+        'users': user,
+        **cursor
     })
 
 
@@ -46,19 +57,7 @@ def admin_user_detail(user_id, user):
     user_detail = User.query.filter(User.id == user).one_or_none()
 
     if user_detail:
-        user_game_id = [game.id for game in user_detail.my_game]
-        user_gamelist = MyGame.query.join(Vendor, Game).filter(MyGame.id.in_(user_game_id)).all()
-
-        games = [{
-            'list_id': game.id,
-            'game_id': game.Game.id,
-            'name': game.Game.name,
-            'cover': game.Game.cover_link,
-            'vendor': {
-                'vendor_id': game.Vendor.id,
-                'name': game.Vendor.name,
-                'distributor': game.Vendor.distributor
-            }} for game in user_gamelist]
+        games, total, cursor = library_page(user_detail.id, ITEM_LIMIT)
 
         return jsonify({
             'username': user_detail.username,
@@ -66,7 +65,8 @@ def admin_user_detail(user_id, user):
             'avatar': user_detail.picture,
             'game': {
                 'games': games,
-                'totalGame': len(user_detail.my_game)
+                'totalGame': total,
+                **cursor
             }
         })
 
@@ -89,6 +89,7 @@ def admin_vendor_add(user_id):
 
             add_vendor = Vendor(name, distributor, publisher, developer, release_date)
             add_vendor.add()
+            suggest_index.put('vendor', add_vendor.id, add_vendor.name, bump_catalog_version())
 
             return jsonify({
                 'literal_status': 'saved',
@@ -129,6 +130,7 @@ def admin_vendor_edit_delete(user_id, vendor_id):
                 vendor.release_date = release_date
 
                 vendor.update()
+                suggest_index.put('vendor', vendor.id, vendor.name, bump_catalog_version())
 
                 return jsonify({
                     'literal_status': 'updated',
@@ -148,7 +150,10 @@ def admin_vendor_edit_delete(user_id, vendor_id):
         vendor = Vendor.query.get(vendor_id)
 
         if vendor:
+            # vendor games are removed with vendor
+            removed = [('vendor', vendor.id)] + [('game', game.id) for game in vendor.game_lists]
             vendor.remove()
+            suggest_index.discard(removed, bump_catalog_version())
             return jsonify({
                 'literal_status': 'deleted',
                 'list_id': vendor.id
@@ -178,6 +183,7 @@ def admin_game_add(user_id):
 
             add_game = Game(name, price, rating, platform, genre, cover_link, vendor)
             add_game.add()
+            suggest_index.put('game', add_game.id, add_game.name, bump_catalog_version())
 
             return ({
                 'literal_status': 'saved',
@@ -218,6 +224,7 @@ def admin_game_edit_delete(user_id, game_id):
             game.cover_link = cover_link
 
             game.update()
+            suggest_index.put('game', game.id, game.name, bump_catalog_version())
 
             return jsonify({
                 'literal_status': 'updated',
@@ -233,6 +240,7 @@ def admin_game_edit_delete(user_id, game_id):
 
         if game:
             game.remove()
+            suggest_index.discard([('game', game.id)], bump_catalog_version())
             return jsonify({
                 'literal_status': 'deleted',
                 'list_id': game.id
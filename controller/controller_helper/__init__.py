@@ -1,16 +1,44 @@
 """
 Controller helper
 """
+from sqlalchemy.exc import OperationalError
+from contextlib import contextmanager
 from flask import current_app
 from functools import wraps
 from flask import request
+from flask import g
+from sqlalchemy import text
 from jose import jwt
+import threading
 import requests
 import datetime
+import hashlib
+import zlib
 
 from model import SystemAuthKey
+from model import User
+from shared import profile_cache
+from shared import token_cache
 from shared import db
 
+from .http_client import http_client
+from .catalog import bump_catalog_version
+from .catalog import request_cache_key
+from .catalog import catalog_etag
+from .filters import array_filters
+from .filters import FILTER_ARGS
+from .filters import filter_args
+from .filters import request_ids
+from .pagination import page_or_cursor
+from .pagination import request_sort
+from .pagination import cached_count
+from .pagination import paginate
+from .serializer import RowSerializer
+from .serializer import request_fields
+from .library import library_page
+from .suggest import suggest_index
+from .jwks import jwks_cache
+
 
 class AuthError(Exception):
     """
@@ -46,21 +74,13 @@ def Auth0Validator(token):
 
     try:
         url = current_app.config.get('AUTH0_DOMAIN')
-        wks_url = f'{url}.well-known/jwks.json'
-        wks_key = requests.get(wks_url)
-
         unverif_token = jwt.get_unverified_header(token)
 
-        rsa_key = {}
-        for k in wks_key.json().get('keys'):
-            if k.get('kid') == unverif_token.get('kid'):
-                rsa_key.update({
-                    "kty": k.get("kty"),
-                    "kid": k.get("kid"),
-                    "use": k.get("use"),
-                    "n": k.get("n"),
-                    "e": k.get("e")
-                })
+        try:
+            rsa_key = jwks_cache.get(url, unverif_token.get('kid'))
+
+        except (requests.RequestException, ValueError) as e:
+            raise ServerError('Server Fault', 'Unable to fetch signing key', e, 500)
 
         if rsa_key:
             try:
@@ -88,47 +108,233 @@ def Auth0Validator(token):
         raise AuthError('Unauthoriozed', 'Broken jwt payload', 401)
 
 
+def verified_token(token):
+    """
+    Verified token cache
+
+    return cached payload of already verified token, or validate it using Auth0Validator,
+    cached payload is expired at the token exp claim.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(key)
+
+    if payload is None:
+        payload = Auth0Validator(token)
+
+        if payload.get('exp'):
+            token_cache.set(key, payload, expires_at=payload.get('exp'))
+
+    return payload
+
+
 def Auth0Identifier(user):
     """
     Auth0 user identificator
 
-    non-decorator Auth0 user identificator function
+    non-decorator Auth0 user identificator function, user profile is resolved from
+    in-memory cache first, then local User table, Auth0 management api is only called
+    for user that is not registered locally yet (first login).
     """
     # pylint: disable=maybe-no-member
 
-    current_time = datetime.datetime.now()
+    profile = profile_cache.get(user)
+
+    if profile is None:
+        local_user = User.query.get(user.split('|', 1)[-1])
+
+        if local_user:
+            profile = {
+                "user_id": local_user.id,
+                "username": local_user.username,
+                "email": local_user.email,
+                "picture": local_user.picture,
+                "role": local_user.role
+            }
+
+        else:
+            profile = Auth0UserProfile(user)
+
+        profile_cache.set(user, profile)
+
+    return profile
+
+
+def Auth0UserProfile(user):
+    """
+    Auth0 user profile
+
+    fetch user profile from Auth0 management api
+    """
     url = current_app.config.get('AUTH0_DOMAIN')
+    token = management_token.get()
 
-    token_query = SystemAuthKey.query
-    expired_token = token_query.filter(SystemAuthKey.expiration <= current_time)
-    token = token_query.order_by(SystemAuthKey.expiration.desc())\
-        .filter(SystemAuthKey.expiration >= current_time)\
-        .first()
+    headers = {"authorization": f'Bearer {token}'}
 
-    if token:
-        counter = token_query.order_by(SystemAuthKey.expiration.desc()).count()
-        user_data = requests.get(f'{url}api/v2/users/{user}', headers={
-            "authorization": f'Bearer {token.token}'
-        })
+    # user and roles is fetched concurrently, and each response is decoded once
+    user_request = http_client.submit('GET', f'{url}api/v2/users/{user}', metric='users', headers=headers)
+    roles_request = http_client.submit('GET', f'{url}api/v2/users/{user}/roles', metric='user_roles', headers=headers)
 
-        roles = requests.get(f'{url}api/v2/users/{user}/roles', headers={
-            "authorization": f'Bearer {token.token}'
-        })
+    user_response = user_request.result()
+    roles_response = roles_request.result()
 
-        if counter > 1:
-            expired_token.delete()
-            db.session.commit()
+    if 401 in (user_response.status_code, roles_response.status_code):
+        # management token is rejected (E.g. revoked), drop it so next call mint new one
+        management_token.clear(token)
 
-        return {
-            "user_id": user_data.json().get('identities')[0].get('user_id'),
-            "username": user_data.json().get('nickname'),
-            "email": user_data.json().get('email'),
-            "picture": user_data.json().get('picture'),
-            "role": roles.json()[0].get('name')
-        }
+    if user_response.status_code != 200 or roles_response.status_code != 200:
+        raise ServerError('Server Fault',
+                          'Unable to fetch user profile',
+                          f'Auth0 user profile error {user_response.status_code}/{roles_response.status_code}',
+                          500)
 
-    else:
-        authorize = requests.post(f'{url}oauth/token', data={
+    user_data = user_response.json()
+    roles = roles_response.json()
+
+    return {
+        "user_id": user_data.get('identities')[0].get('user_id'),
+        "username": user_data.get('nickname'),
+        "email": user_data.get('email'),
+        "picture": user_data.get('picture'),
+        "role": roles[0].get('name')
+    }
+
+
+class ManagementToken:
+    """
+    Auth0 management token holder
+
+    keep management token in process memory, token is refreshed in background
+    thread shortly before expiration and concurrent refresh is collapsed into
+    single oauth/token call. sysAuth0TokenStorage is only used as cross-worker fallback,
+    and only token minted for AUTH0_SYSTEM_AUDIENCE is reused from it.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._token = None
+        self._expiration = None
+        self._refreshing = False
+
+    def get(self):
+        current_time = datetime.datetime.now()
+        token, expiration = self._token, self._expiration
+
+        if token and expiration > current_time:
+            if expiration - self._margin() <= current_time:
+                self._refresh_background()
+
+            return token
+
+        with self._lock:
+            # another thread may already done the refresh while we wait
+            if self._token and self._expiration > datetime.datetime.now():
+                return self._token
+
+            self._load(datetime.datetime.now())
+            return self._token
+
+    def clear(self, token=None):
+        """
+        forget management token, token given as rejected by Auth0 is also removed from storage
+        so other worker doesn't reuse it
+        """
+        # pylint: disable=maybe-no-member
+        with self._lock:
+            if token is None or token == self._token:
+                self._token = None
+                self._expiration = None
+
+            if token is not None:
+                SystemAuthKey.query.filter(SystemAuthKey.token == token).delete()
+                db.session.commit()
+
+    def _margin(self):
+        return datetime.timedelta(seconds=current_app.config.get('AUTH0_TOKEN_REFRESH_MARGIN'))
+
+    def _refresh_background(self):
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        app = current_app._get_current_object()
+        threading.Thread(target=self._background_refresh, args=(app,), daemon=True).start()
+
+    def _background_refresh(self, app):
+        try:
+            with app.app_context():
+                with self._lock:
+                    self._load(datetime.datetime.now() + self._margin())
+
+        except Exception:
+            app.logger.exception('Auth0 management token refresh failed')
+
+        finally:
+            self._refreshing = False
+
+    def _load(self, valid_until):
+        """
+        reuse stored token that valid until valid_until (minted by other worker), otherwise mint new one
+        """
+        if self._use_stored(valid_until):
+            return
+
+        with self._mint_lock():
+            # other worker may have minted the token while we wait for the lock
+            if not self._use_stored(valid_until):
+                self._mint()
+
+    def _use_stored(self, valid_until):
+        # pylint: disable=maybe-no-member
+        stored = SystemAuthKey.query\
+            .filter(SystemAuthKey.audience == current_app.config.get('AUTH0_SYSTEM_AUDIENCE'))\
+            .filter(SystemAuthKey.expiration > valid_until)\
+            .order_by(SystemAuthKey.expiration.desc())\
+            .first()
+
+        if stored:
+            self._token = stored.token
+            self._expiration = stored.expiration
+
+        return bool(stored)
+
+    @contextmanager
+    def _mint_lock(self):
+        """
+        cluster wide minting lock using postgres session level advisory lock, so only one worker
+        call oauth/token at token expiration. the lock is taken on its own connection and released
+        right after minting (or reusing) token, so it never live on in request transaction.
+        """
+        # pylint: disable=maybe-no-member
+        if db.engine.dialect.name != 'postgresql':
+            yield
+            return
+
+        with db.engine.connect() as connection:
+            locked = False
+
+            try:
+                # setting is reverted when connection is returned to the pool
+                timeout = int(current_app.config.get('AUTH0_TOKEN_LOCK_TIMEOUT') * 1000)
+                connection.execute(text(f'SET lock_timeout = {timeout}'))
+                connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MINT_LOCK_KEY})
+                locked = True
+
+            except OperationalError:
+                # lock holder is taking too long, mint token on our own rather than failing the request
+                current_app.logger.warning('Auth0 management token lock timeout')
+
+            try:
+                yield
+
+            finally:
+                if locked:
+                    connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MINT_LOCK_KEY})
+
+    def _mint(self):
+        # pylint: disable=maybe-no-member
+        url = current_app.config.get('AUTH0_DOMAIN')
+        authorize = http_client.post(f'{url}oauth/token', metric='oauth_token', data={
             "client_id": current_app.config.get('AUTH0_CLIENT'),
             "client_secret": current_app.config.get('AUTH0_SECRET'),
             "audience": current_app.config.get('AUTH0_SYSTEM_AUDIENCE'),
@@ -136,26 +342,20 @@ def Auth0Identifier(user):
         })
 
         if authorize.status_code == 200:
-            token = authorize.json().get('access_token')
-            token_type = authorize.json().get('token_type')
-
-            token_time = datetime.timedelta(seconds=authorize.json().get('expires_in'))
+            auth_response = authorize.json()
             current_time = datetime.datetime.now()
-            token_expire_time = current_time + token_time
+            token_time = datetime.timedelta(seconds=auth_response.get('expires_in'))
 
-            securityToken = SystemAuthKey(token=token, expiration=token_expire_time)
+            securityToken = SystemAuthKey(token=auth_response.get('access_token'),
+                                          expiration=current_time + token_time,
+                                          audience=current_app.config.get('AUTH0_SYSTEM_AUDIENCE'))
             securityToken.save()
 
-            user = requests.get(f'{url}api/v2/users/{user}', headers={
-                "authorization": f'{token_type} {securityToken.token}'
-            })
+            SystemAuthKey.query.filter(SystemAuthKey.expiration <= current_time).delete()
+            db.session.commit()
 
-            return {
-                "user_id": user.json().get('identities')[0].get('user_id'),
-                "username": user.json().get('nickname'),
-                "email": user.json().get('email'),
-                "picture": user.json().get('picture')
-            }
+            self._token = securityToken.token
+            self._expiration = securityToken.expiration
 
         else:
             raise ServerError('Server Fault',
@@ -164,6 +364,12 @@ def Auth0Identifier(user):
                               500)
 
 
+# advisory lock key of management token minting
+MINT_LOCK_KEY = zlib.crc32(b'sysAuth0TokenStorage')
+
+management_token = ManagementToken()
+
+
 def auth_header_parser(headers):
     """
     Authorization header parser
@@ -189,25 +395,35 @@ def rbac_checker(payload, permission):
         raise AuthError('Unauthoriozed', 'Permissions unauthorized', 401)
 
 
-def authenticate(f):
+def request_token_payload():
     """
-    endpoint authentication decorator
+    Request token payload
+
+    parse and verify bearer token once per request, decoded claims is stored in flask.g
     """
-    @wraps(f)
-    def authenticate_decorator(*args, **kwargs):
+    if 'auth0_payload' not in g:
         try:
             headers = request.headers['Authorization']
-            token = auth_header_parser(headers)
-            validator = Auth0Validator(token)
-            if validator:
-                user_obj = validator.get('sub')
-                user_id = Auth0Identifier(user_obj).get('user_id')
-                return f(user_id, *args, **kwargs)
-            else:
-                return False
         except KeyError:
             raise AuthError('Unauthorized', 'Broken Authorization header', 401)
 
+        token = auth_header_parser(headers)
+        g.auth0_payload = verified_token(token)
+
+    return g.auth0_payload
+
+
+def authenticate(f):
+    """
+    endpoint authentication decorator
+    """
+    @wraps(f)
+    def authenticate_decorator(*args, **kwargs):
+        payload = request_token_payload()
+        user_obj = payload.get('sub')
+        user_id = Auth0Identifier(user_obj).get('user_id')
+        return f(user_id, *args, **kwargs)
+
     return authenticate_decorator
 
 
@@ -215,18 +431,12 @@ def authorize(permission=''):
     def authorization_decorator(f):
         @wraps(f)
         def wrapper_func(*args, **kwargs):
-            try:
-                headers = request.headers['Authorization']
-                token = auth_header_parser(headers)
-                payload = Auth0Validator(token)
-                check_permission = rbac_checker(payload, permission)
-                if check_permission:
-                    return f(*args, **kwargs)
-                else:
-                    raise AuthError('Unauthoriozed', 'Permissions unauthorized', 401)
-
-            except KeyError:
-                raise AuthError('Unauthoriozed', 'Broken Authorization header', 401)
+            payload = request_token_payload()
+            check_permission = rbac_checker(payload, permission)
+            if check_permission:
+                return f(*args, **kwargs)
+            else:
+                raise AuthError('Unauthoriozed', 'Permissions unauthorized', 401)
 
         return wrapper_func
     return authorization_decorator
@@ -0,0 +1,64 @@
+"""
+Catalog helper
+"""
+from flask import current_app
+from flask import make_response
+from functools import wraps
+from flask import request
+
+from model import CatalogVersion
+from shared import catalog_cache
+
+
+def catalog_version():
+    """
+    current catalog version, read from database at most once per CATALOG_VERSION_TTL
+    """
+    version = catalog_cache.get('catalog_version')
+
+    if version is None:
+        version = CatalogVersion.get()
+        catalog_cache.set('catalog_version', version, ttl=current_app.config.get('CATALOG_VERSION_TTL'))
+
+    return version
+
+
+def bump_catalog_version():
+    """
+    increase catalog version after catalog write, so every cached response and etag is outdated
+    """
+    version = CatalogVersion.bump()
+    catalog_cache.set('catalog_version', version, ttl=current_app.config.get('CATALOG_VERSION_TTL'))
+    return version
+
+
+def request_cache_key(*args):
+    """
+    response cache key of current request, built from catalog version, request path and values of
+    query parameter named in args (the ones read by the endpoint), so unknown parameter can't add cache entry
+    """
+    return (catalog_version(), request.path, tuple((name, tuple(request.args.getlist(name))) for name in args))
+
+
+def catalog_etag(f):
+    """
+    conditional GET decorator for public catalog endpoint, strong etag is derived from
+    catalog version so unchanged catalog is answered with 304 before running any query
+    """
+    @wraps(f)
+    def catalog_etag_decorator(*args, **kwargs):
+        etag = f'catalog-{catalog_version()}'
+
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        response = make_response(f(*args, **kwargs))
+
+        if response.status_code == 200:
+            response.set_etag(etag)
+
+        return response
+
+    return catalog_etag_decorator
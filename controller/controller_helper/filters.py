@@ -0,0 +1,80 @@
+"""
+Catalog filter helper
+"""
+from sqlalchemy import cast
+from flask import current_app
+from flask import request
+from flask import abort
+
+from model import Game
+
+FILTER_MAX_VALUES = 20
+ARRAY_FILTERS = {
+    'genre': Game.genre,
+    'platform': Game.platform,
+}
+# query parameter read by filter_args()
+FILTER_ARGS = tuple(arg for name in ARRAY_FILTERS for arg in (name, f'{name}_match'))
+
+
+def filter_args():
+    """
+    requested ?genre= and ?platform= values (comma separated or repeated) and their
+    ?<name>_match= mode (any or all, default any), unknown mode or too many values is rejected.
+    """
+    filters = {}
+
+    for name in ARRAY_FILTERS:
+        values = []
+
+        for arg in request.args.getlist(name):
+            values.extend(value.strip() for value in arg.split(',') if value.strip())
+
+        if not values:
+            continue
+
+        match = request.args.get(f'{name}_match', 'any')
+
+        if match not in ('any', 'all') or len(values) > FILTER_MAX_VALUES:
+            abort(422, 'Invalid filter')
+
+        filters[name] = (match, tuple(sorted(set(values))))
+
+    return filters
+
+
+def array_filters(filters):
+    """
+    compile filter_args() into sql array operator, overlap (&&) for any-of and
+    containment (@>) for all-of, both are served by GIN index of the array column.
+    """
+    clauses = []
+
+    for name, (match, values) in filters.items():
+        column = ARRAY_FILTERS[name]
+        operator = '@>' if match == 'all' else '&&'
+        clauses.append(column.op(operator)(cast(list(values), column.type)))
+
+    return clauses
+
+
+def request_ids():
+    """
+    requested ?ids= (comma separated id) for batch get, in requested order without duplicate,
+    None when not requested. non integer id or more than BATCH_MAX_IDS id is rejected.
+    """
+    ids = request.args.get('ids')
+
+    if ids is None:
+        return None
+
+    try:
+        ids = list(dict.fromkeys(int(value) for value in ids.split(',') if value.strip()))
+
+    except ValueError:
+        abort(422, 'Invalid ids')
+
+    if not ids or len(ids) > current_app.config['BATCH_MAX_IDS']:
+        abort(422, 'Invalid ids')
+
+    return ids
@@ -0,0 +1,131 @@
+"""
+Auth0 HTTP client
+"""
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import current_app
+import threading
+import requests
+import time
+
+
+class HTTPClient:
+    """
+    Pooled HTTP client
+
+    shared keep-alive session used for every Auth0 call, with connection pool,
+    connect/read timeout, bounded retry with backoff and per-call latency metrics.
+    independent calls can be run concurrently in small shared thread pool using submit.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session = None
+        self._executor = None
+        self._adapters = {}
+        self._metrics = {}
+
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session(current_app.config)
+
+                    for prefix, adapter in self._adapters.items():
+                        self._session.mount(prefix, adapter)
+
+        return self._session
+
+    def request(self, method, url, metric=None, **kwargs):
+        config = current_app.config
+        kwargs.setdefault('timeout', (config.get('AUTH0_HTTP_CONNECT_TIMEOUT'),
+                                      config.get('AUTH0_HTTP_READ_TIMEOUT')))
+
+        started = time.perf_counter()
+        failed = True
+
+        try:
+            response = self.session().request(method, url, **kwargs)
+            failed = response.status_code >= 500
+            return response
+
+        finally:
+            elapsed = time.perf_counter() - started
+            self._record(metric or method, elapsed, failed)
+            current_app.logger.debug('auth0 %s %s took %.1fms', method, metric or url, elapsed * 1000)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def submit(self, method, url, **kwargs):
+        """
+        run request in shared thread pool, return future of the response
+        """
+        app = current_app._get_current_object()
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=app.config.get('AUTH0_HTTP_WORKERS'),
+                                                        thread_name_prefix='auth0-http')
+
+        return self._executor.submit(self._request_in_context, app, method, url, **kwargs)
+
+    def mount(self, prefix, adapter):
+        """
+        route request with url prefix to a custom transport adapter (E.g. local Auth0 stand-in)
+        """
+        with self._lock:
+            self._adapters[prefix] = adapter
+            if self._session is not None:
+                self._session.mount(prefix, adapter)
+
+    def metrics(self):
+        """
+        latency metrics snapshot, keyed by metric name
+        """
+        with self._lock:
+            return {name: dict(metric) for name, metric in self._metrics.items()}
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+
+    def _request_in_context(self, app, method, url, **kwargs):
+        with app.app_context():
+            return self.request(method, url, **kwargs)
+
+    def _record(self, name, elapsed, failed):
+        with self._lock:
+            metric = self._metrics.setdefault(name, {'count': 0, 'errors': 0, 'total': 0.0, 'max': 0.0})
+            metric['count'] += 1
+            metric['errors'] += int(failed)
+            metric['total'] += elapsed
+            metric['max'] = max(metric['max'], elapsed)
+
+    @staticmethod
+    def _create_session(config):
+        # only GET is retried on read error and error status, POST (token minting) is only
+        # retried on connection error, when request never reached Auth0
+        retry = Retry(total=config.get('AUTH0_HTTP_RETRIES'),
+                      backoff_factor=config.get('AUTH0_HTTP_BACKOFF'),
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(['GET']),
+                      raise_on_status=False)
+
+        adapter = HTTPAdapter(pool_connections=config.get('AUTH0_HTTP_POOL_SIZE'),
+                              pool_maxsize=config.get('AUTH0_HTTP_POOL_SIZE'),
+                              max_retries=retry)
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+
+http_client = HTTPClient()
@@ -0,0 +1,83 @@
+"""
+JWKS key cache
+"""
+from flask import current_app
+import threading
+import requests
+import time
+
+from .http_client import http_client
+
+
+class JWKSCache:
+    """
+    JWKS key cache
+
+    process-wide Auth0 signing key cache keyed by kid, the key set is
+    refetched once AUTH0_JWKS_TTL is reached, or earlier when an unknown kid
+    shows up (at most once per AUTH0_JWKS_REFRESH_INTERVAL).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._url = None
+        self._keys = {}
+        self._fetched_at = 0.0
+        self._attempted_at = 0.0
+
+    def get(self, url, kid):
+        ttl = current_app.config.get('AUTH0_JWKS_TTL')
+        key = self._keys.get(kid) if self._url == url else None
+
+        if key and time.monotonic() - self._fetched_at < ttl:
+            return key
+
+        with self._lock:
+            now = time.monotonic()
+            known = self._url == url and bool(self._keys)
+            key = self._keys.get(kid) if known else None
+
+            if key and now - self._fetched_at < ttl:
+                return key
+
+            # refetch on expiry or unknown kid, rate limited so a flood of
+            # unknown kid (or an Auth0 outage) does not hammer the jwks endpoint
+            interval = current_app.config.get('AUTH0_JWKS_REFRESH_INTERVAL')
+            if known and now - self._attempted_at < interval:
+                return key
+
+            self._refresh(url, now)
+            return self._keys.get(kid)
+
+    def clear(self):
+        with self._lock:
+            self._url = None
+            self._keys = {}
+            self._fetched_at = 0.0
+            self._attempted_at = 0.0
+
+    def _refresh(self, url, now):
+        self._attempted_at = now
+
+        try:
+            wks_key = http_client.get(f'{url}.well-known/jwks.json', metric='jwks')
+            wks_key.raise_for_status()
+            keys = wks_key.json().get('keys')
+
+        except (requests.RequestException, ValueError):
+            # keep serving the previous key set when Auth0 is unreachable
+            if self._url == url and self._keys:
+                return
+            raise
+
+        self._keys = {k.get('kid'): {
+            "kty": k.get("kty"),
+            "kid": k.get("kid"),
+            "use": k.get("use"),
+            "n": k.get("n"),
+            "e": k.get("e")
+        } for k in keys}
+        self._url = url
+        self._fetched_at = now
+
+
+jwks_cache = JWKSCache()
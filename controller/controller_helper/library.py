@@ -0,0 +1,43 @@
+"""
+User library helper
+"""
+from sqlalchemy import func
+
+from model import MyGame
+from model import Vendor
+from model import Game
+from shared import db
+
+from .serializer import RowSerializer
+from .pagination import page_or_cursor
+
+# user library item shape, list_id must stay the first column (cursor key)
+LIBRARY_ROW = RowSerializer(
+    list_id=MyGame.id,
+    game_id=Game.id,
+    name=Game.name,
+    cover=Game.cover_link,
+    vendor=RowSerializer(
+        vendor_id=Vendor.id,
+        name=Vendor.name,
+        distributor=Vendor.distributor,
+    )
+)
+
+
+def library_page(owner, limit):
+    """
+    one page (?page= or ?cursor=) of owner library in single joined query plus owner count query,
+    both served by owner index, so cost doesn't grow with library size.
+    return page items, total item and extra cursor field.
+    """
+    # pylint: disable=maybe-no-member
+    games = db.session.query(*LIBRARY_ROW.columns)\
+        .select_from(MyGame)\
+        .join(MyGame.Game)\
+        .join(MyGame.Vendor)\
+        .filter(MyGame.owner == owner)
+    games, cursor = page_or_cursor(games, [MyGame.id], lambda x: [x[0]], limit)
+    total = db.session.query(func.count(MyGame.id)).filter(MyGame.owner == owner).scalar()
+
+    return LIBRARY_ROW.dump_all(games), total, cursor
@@ -0,0 +1,140 @@
+"""
+Pagination helper
+"""
+from sqlalchemy import tuple_
+from flask import request
+from flask import abort
+import datetime
+import binascii
+import base64
+import json
+
+from shared import catalog_cache
+
+from .catalog import catalog_version
+
+
+def paginate(query, page, limit):
+    """
+    offset pagination, LIMIT/OFFSET is pushed into the sql query
+    """
+    page = max(page, 1)
+    return query.limit(limit).offset((page - 1) * limit).all()
+
+
+def keyset_paginate(query, columns, key, cursor, limit, descending=False):
+    """
+    keyset (cursor) pagination, query is ordered by columns (last column must be unique)
+    and seek right after the position encoded in cursor, so deep page cost the same as first page.
+    key is function returning columns value of a result row, used for building next cursor.
+    """
+    query = query.order_by(*ordering(columns, descending))
+
+    if cursor:
+        position = decode_cursor(cursor)
+
+        if len(position) != len(columns):
+            abort(422, 'Invalid cursor')
+
+        position = [cursor_value(column, value) for column, value in zip(columns, position)]
+
+        if descending:
+            query = query.filter(tuple_(*columns) < tuple_(*position))
+
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*position))
+
+    items = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(key(items[limit - 1])) if len(items) > limit else None
+
+    return items[:limit], next_cursor
+
+
+def page_or_cursor(query, columns, key, limit, descending=False):
+    """
+    paginate in cursor mode when ?cursor= is requested (empty cursor for first page),
+    otherwise in ?page= offset mode. return page items and extra response field.
+    """
+    cursor = request.args.get('cursor')
+
+    if cursor is None:
+        page = request.args.get('page', 1, type=int)
+        return paginate(query.order_by(*ordering(columns, descending)), page, limit), {}
+
+    items, next_cursor = keyset_paginate(query, columns, key, cursor, limit, descending)
+    return items, {'next': next_cursor}
+
+
+def ordering(columns, descending):
+    return [column.desc() for column in columns] if descending else columns
+
+
+def request_sort(sorts, tie_break):
+    """
+    ?sort=<field> (ascending) or ?sort=-<field> (descending) ordering, return ordering columns
+    (requested sort column followed by unique tie_break column) and its direction
+    """
+    sort = request.args.get('sort')
+
+    if sort is None:
+        return [tie_break], False
+
+    descending = sort.startswith('-')
+    column = sorts.get(sort[1:] if descending else sort)
+
+    if column is None:
+        abort(422, 'Invalid sort')
+
+    return [column, tie_break], descending
+
+
+def encode_cursor(position):
+    # datetime position is encoded as string, database parse it back on comparison
+    return base64.urlsafe_b64encode(json.dumps(position, default=str).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+    except (binascii.Error, ValueError):
+        abort(422, 'Invalid cursor')
+
+    if not isinstance(position, list):
+        abort(422, 'Invalid cursor')
+
+    return position
+
+
+def cursor_value(column, value):
+    """
+    check cursor position value against type of its column, so client supplied cursor
+    can't reach the database with mismatched type. datetime is parsed back from its string form.
+    """
+    python_type = column.type.python_type
+
+    if python_type is datetime.datetime and isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value)
+
+        except ValueError:
+            abort(422, 'Invalid cursor')
+
+    if isinstance(value, bool) or not isinstance(value, python_type):
+        abort(422, 'Invalid cursor')
+
+    return value
+
+
+def cached_count(key, query, tags=()):
+    """
+    total row count of count query, cached in catalog_cache under key
+    """
+    cache_key = ('count', catalog_version(), key)
+    total = catalog_cache.get(cache_key)
+
+    if total is None:
+        total = query.scalar()
+        catalog_cache.set(cache_key, total, tags=tags)
+
+    return total
@@ -0,0 +1,61 @@
+"""
+Row serializer helper
+"""
+from flask import request
+from flask import abort
+
+
+class RowSerializer:
+    """
+    declarative serializer for column-projected query, each field map response key to
+    a column or nested RowSerializer. columns is flat column list to be selected
+    (db.session.query(*serializer.columns)) and dump() map a result row back to response shape
+    without loading ORM entity.
+    """
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self.columns = []
+        self._leaves = []
+        self._nested = []
+
+        for key, field in fields.items():
+            if isinstance(field, RowSerializer):
+                self._nested.append((key, field, len(self.columns)))
+                self.columns.extend(field.columns)
+
+            else:
+                self._leaves.append((key, len(self.columns)))
+                self.columns.append(field)
+
+    def dump(self, row, offset=0):
+        item = {key: row[offset + index] for key, index in self._leaves}
+
+        for key, nested, start in self._nested:
+            item[key] = nested.dump(row, offset + start)
+
+        return item
+
+    def dump_all(self, rows, offset=0):
+        return [self.dump(row, offset) for row in rows]
+
+    def only(self, names):
+        return RowSerializer(**{key: field for key, field in self.fields.items() if key in names})
+
+
+def request_fields(serializer):
+    """
+    sparse fieldset, narrow serializer (and so selected columns) to comma separated
+    top level field requested in ?fields=, field outside serializer is rejected.
+    """
+    fields = request.args.get('fields')
+
+    if fields is None:
+        return serializer
+
+    names = {name.strip() for name in fields.split(',') if name.strip()}
+
+    if not names or not names.issubset(serializer.fields):
+        abort(422, 'Invalid fields')
+
+    return serializer.only(names)
@@ -0,0 +1,184 @@
+"""
+Type-ahead suggestion helper
+"""
+from flask import current_app
+from sqlalchemy import func
+import threading
+import bisect
+import time
+
+from model import MyGame
+from model import Vendor
+from model import Game
+from shared import db
+
+from .catalog import catalog_version
+
+
+class SuggestIndex:
+    """
+    in-memory prefix index of game and vendor name
+
+    every word of a name is indexed (so "souls" suggest "Dark Souls") under each of its leading
+    1..SUGGEST_PREFIX_LENGTH characters, in bucket kept in popularity order (number of owner in user
+    gamelist), so most popular matching name is found without scanning every match. index is updated
+    in place by catalog write of this worker, and rebuilt in background thread (while current index
+    keep serving) when catalog is written by other worker or after SUGGEST_INDEX_TTL.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._buckets = {}
+        self._items = {}
+        self._prefix_length = 0
+        self._rebuilding = False
+        self.version = None
+        self.built_at = 0
+
+    def build(self):
+        # pylint: disable=maybe-no-member
+        version = catalog_version()
+        prefix_length = current_app.config['SUGGEST_PREFIX_LENGTH']
+        games = db.session.query(Game.id, Game.name, func.count(MyGame.id))\
+            .outerjoin(MyGame, MyGame.game == Game.id)\
+            .group_by(Game.id)\
+            .all()
+        vendors = db.session.query(Vendor.id, Vendor.name, func.count(MyGame.id))\
+            .outerjoin(MyGame, MyGame.vendor == Vendor.id)\
+            .group_by(Vendor.id)\
+            .all()
+
+        items = {}
+        items.update({('game', game_id): (name, popularity) for game_id, name, popularity in games})
+        items.update({('vendor', vendor_id): (name, popularity) for vendor_id, name, popularity in vendors})
+
+        buckets = {}
+
+        for item, (name, popularity) in items.items():
+            for prefix, entry in self._entries(item, name, popularity, prefix_length):
+                buckets.setdefault(prefix, []).append(entry)
+
+        for bucket in buckets.values():
+            bucket.sort()
+
+        with self._lock:
+            self._buckets = buckets
+            self._items = items
+            self._prefix_length = prefix_length
+            self.version = version
+            self.built_at = time.time()
+
+    def search(self, prefix, limit):
+        self._refresh()
+        prefix = ' '.join(prefix.casefold().split())
+        max_candidates = current_app.config['SUGGEST_MAX_CANDIDATES']
+        suggestions = {}
+
+        with self._lock:
+            # every entry of short prefix bucket match, longer prefix is filtered from bucket of
+            # its leading characters, looking at most SUGGEST_MAX_CANDIDATES most popular entry
+            exact = len(prefix) <= self._prefix_length
+            bucket = self._buckets.get(prefix[:self._prefix_length], ())
+
+            for index, (_, name, item, key) in enumerate(bucket):
+                if len(suggestions) == limit or (not exact and index == max_candidates):
+                    break
+
+                if exact or key.startswith(prefix):
+                    suggestions.setdefault(item, name)
+
+        return [{'type': kind, 'id': item_id, 'name': name} for (kind, item_id), name in suggestions.items()]
+
+    def put(self, kind, item_id, name, version):
+        """
+        add or rename game / vendor after catalog write, version is catalog version bumped by the write
+        """
+        item = (kind, item_id)
+
+        with self._lock:
+            popularity = self._remove(item)
+            self._items[item] = (name, popularity)
+
+            for prefix, entry in self._entries(item, name, popularity, self._prefix_length):
+                bisect.insort(self._buckets.setdefault(prefix, []), entry)
+
+            self._advance(version)
+
+    def discard(self, items, version):
+        """
+        remove deleted game / vendor ((kind, id) pair) after catalog write
+        """
+        with self._lock:
+            for item in items:
+                self._remove(item)
+
+            self._advance(version)
+
+    def _refresh(self):
+        if self.built_at and not self._outdated():
+            return
+
+        if self.built_at:
+            self._refresh_background()
+            return
+
+        # index is not built yet, only one thread build it, the others wait and use built index
+        with self._build_lock:
+            if not self.built_at:
+                self.build()
+
+    def _refresh_background(self):
+        with self._build_lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        app = current_app._get_current_object()
+        threading.Thread(target=self._background_build, args=(app,), daemon=True).start()
+
+    def _background_build(self, app):
+        try:
+            with app.app_context():
+                self.build()
+
+        except Exception:
+            app.logger.exception('Suggestion index rebuild failed')
+
+        finally:
+            self._rebuilding = False
+
+    def _outdated(self):
+        expired = time.time() - self.built_at > current_app.config['SUGGEST_INDEX_TTL']
+        return expired or self.version != catalog_version()
+
+    def _remove(self, item):
+        if item not in self._items:
+            return 0
+
+        name, popularity = self._items.pop(item)
+
+        for prefix, entry in self._entries(item, name, popularity, self._prefix_length):
+            bucket = self._buckets.get(prefix, [])
+            position = bisect.bisect_left(bucket, entry)
+
+            if position < len(bucket) and bucket[position] == entry:
+                del bucket[position]
+
+        return popularity
+
+    def _advance(self, version):
+        # index already has every write before this one, otherwise leave it outdated to be rebuilt
+        if self.version == version - 1:
+            self.version = version
+
+    @staticmethod
+    def _entries(item, name, popularity, prefix_length):
+        """
+        (prefix, bucket entry) pair of every word suffix of name, entry is ordered by popularity then name
+        """
+        words = name.casefold().split()
+        keys = {' '.join(words[index:]) for index in range(len(words))}
+        return [(key[:length], (-popularity, name, item, key))
+                for key in keys for length in range(1, min(len(key), prefix_length) + 1)]
+
+suggest_index = SuggestIndex()
@@ -1,113 +1,499 @@
 from flask_cors import CORS
 from flask import Blueprint
-from flask import request
 from flask import jsonify
+from flask import request
+from flask import current_app
 from flask import abort
+from sqlalchemy import union_all
+from sqlalchemy import literal
+from sqlalchemy import select
+from sqlalchemy import Integer
+from sqlalchemy import String
+from sqlalchemy import true
+from sqlalchemy import cast
+from sqlalchemy import func
+from sqlalchemy import case
+from sqlalchemy import and_
+
+from .controller_helper import request_cache_key
+from .controller_helper import RowSerializer
+from .controller_helper import request_fields
+from .controller_helper import catalog_etag
+from .controller_helper import array_filters
+from .controller_helper import FILTER_ARGS
+from .controller_helper import page_or_cursor
+from .controller_helper import request_sort
+from .controller_helper import filter_args
+from .controller_helper import request_ids
+from .controller_helper import cached_count
+from .controller_helper import suggest_index
+from .controller_helper import paginate
 
+from json_encoder import stream_ndjson
+from model import GameRanking
+from model import GameFacet
 from model import Vendor
 from model import Game
+from shared import catalog_cache
 from shared import db
 
 public = Blueprint('public_endpoint', __name__)
 ITEM_LIMIT = 10
+SEARCH_MAX_LENGTH = 200
 
 # set cors in blueprint level
 CORS(public)
 
+# leaderboard ranking column, served by (column, game) index of ranking summary
+LEADERBOARD_RANKS = {
+    'owned': GameRanking.owners,
+    'played': GameRanking.players,
+}
+
+# sortable game list field, every sort column is backed by composite (column, id) index
+GAME_SORTS = {
+    'rating': Game.rating,
+    'price': Game.price,
+    'name': Game.name,
+    'release_date': Vendor.release_date,
+}
+
+# response row shape, list row id must stay the first column (cursor key) unless it is selected separately
+GAME_LIST_ROW = RowSerializer(
+    game_id=Game.id,
+    gameName=Game.name,
+    rating=Game.rating,
+    price=Game.price,
+    cover=Game.cover_link,
+    vendor=RowSerializer(
+        name=Vendor.name,
+        distributor=Vendor.distributor,
+    )
+)
+GAME_EXPORT_ROW = RowSerializer(
+    game_id=Game.id,
+    gameName=Game.name,
+    rating=Game.rating,
+    price=Game.price,
+    genre=Game.genre,
+    platform=Game.platform,
+    cover=Game.cover_link,
+    vendor=RowSerializer(
+        vendor_id=Vendor.id,
+        name=Vendor.name,
+        publisher=Vendor.publisher,
+        distributor=Vendor.distributor,
+        developer=Vendor.developer,
+        releaseDate=Vendor.release_date,
+    )
+)
+GAME_DETAIL_ROW = RowSerializer(
+    gameName=Game.name,
+    rating=Game.rating,
+    price=Game.price,
+    genre=Game.genre,
+    platform=Game.platform,
+    cover=Game.cover_link,
+    releaseDate=Vendor.release_date,
+    vendor=RowSerializer(
+        name=Vendor.name,
+        publisher=Vendor.publisher,
+        distributor=Vendor.distributor,
+        developer=Vendor.developer,
+    )
+)
+VENDOR_DETAIL_ROW = RowSerializer(
+    name=Vendor.name,
+    publisher=Vendor.publisher,
+    distributor=Vendor.distributor,
+    developer=Vendor.developer,
+)
+LEADERBOARD_ROW = RowSerializer(
+    game_id=Game.id,
+    gameName=Game.name,
+    cover=Game.cover_link,
+    owners=GameRanking.owners,
+    players=GameRanking.players,
+    vendor=RowSerializer(
+        name=Vendor.name,
+    )
+)
+VENDOR_LIST_ROW = RowSerializer(
+    vendor_id=Vendor.id,
+    name=Vendor.name,
+)
+
 
 @public.route('/api/gamelists')
+@catalog_etag
 def public_games():
     # pylint: disable=maybe-no-member
 
-    game_lists = []
-    page = request.args.get('page', 1, type=int)
-    start = (page - 1) * ITEM_LIMIT
-    end = start + ITEM_LIMIT
+    ids = request_ids()
+
+    if ids is not None:
+        return public_games_batch(ids)
+
+    filters = filter_args()
+    row = request_fields(GAME_LIST_ROW)
+    columns, descending = request_sort(GAME_SORTS, Game.id)
+    cache_key = request_cache_key('page', 'cursor', 'sort', 'fields', *FILTER_ARGS)
+    response = catalog_cache.get(cache_key)
+
+    if response is None:
+        clauses = array_filters(filters)
+        games = db.session.query(*columns, *row.columns).join(Vendor, Vendor.id == Game.vendor).filter(*clauses)
+        games, cursor = page_or_cursor(games, columns, lambda x: list(x[:len(columns)]), ITEM_LIMIT, descending)
+        total = cached_count(
+            ('games', tuple(sorted(filters.items()))),
+            db.session.query(func.count(Game.id)).filter(*clauses),
+            tags=['gamelists']
+        )
+
+        game_lists = row.dump_all(games, len(columns))
+
+        response = {
+            'games': game_lists,
+            'total': total,
+            **cursor
+        }
+        catalog_cache.set(cache_key, response, tags=['gamelists'])
+
+    return jsonify(response)
+
+
+def public_games_batch(ids):
+    # pylint: disable=maybe-no-member
+
+    row = request_fields(GAME_DETAIL_ROW)
+    cache_key = request_cache_key('ids', 'fields')
+    response = catalog_cache.get(cache_key)
+
+    if response is None:
+        games = db.session.query(Game.id, *row.columns)\
+            .join(Vendor, Vendor.id == Game.vendor)\
+            .filter(Game.id.in_(ids))\
+            .all()
+        games = {game[0]: {'game_id': game[0], **row.dump(game, 1)} for game in games}
+
+        response = {
+            'games': [games[game_id] for game_id in ids if game_id in games],
+            'missing': [game_id for game_id in ids if game_id not in games]
+        }
+        catalog_cache.set(cache_key, response, tags=['gamelists'])
+
+    return jsonify(response)
+
+
+@public.route('/api/gamelists/search')
+@catalog_etag
+def public_games_search():
+    # pylint: disable=maybe-no-member
+
+    keyword = request.args.get('q', '').strip()
+
+    if not keyword or len(keyword) > SEARCH_MAX_LENGTH:
+        abort(422, 'Invalid search query')
+
+    cache_key = request_cache_key('q', 'page')
+    response = catalog_cache.get(cache_key)
+
+    if response is None:
+        page = request.args.get('page', 1, type=int)
+        search_query = func.websearch_to_tsquery('simple', keyword)
+
+        max_candidates = current_app.config['SEARCH_MAX_CANDIDATES']
+        matched = Game.search_vector.op('@@')(search_query)
+        name_matched = func.ts_filter(Game.search_vector, '{a}').op('@@')(search_query)
+
+        # only SEARCH_MAX_CANDIDATES match is ranked, so broad keyword doesn't rank every matching game.
+        # candidate is picked in fixed order (game name match first, then by id) so every page rank the same set
+        candidates = db.session.query(Game.id, func.ts_rank_cd(Game.search_vector, search_query).label('rank'))\
+            .filter(matched)\
+            .order_by(name_matched.desc(), Game.id)\
+            .limit(max_candidates)\
+            .subquery()
+        games = db.session.query(*GAME_LIST_ROW.columns)\
+            .select_from(candidates)\
+            .join(Game, Game.id == candidates.c.id)\
+            .join(Vendor, Vendor.id == Game.vendor)\
+            .order_by(candidates.c.rank.desc(), Game.id)
+        games = paginate(games, page, ITEM_LIMIT)
+
+        # more match than candidate, only need to find one match past the limit
+        truncated = db.session.query(Game.id)\
+            .filter(matched)\
+            .offset(max_candidates)\
+            .limit(1)\
+            .first() is not None
+
+        game_lists = GAME_LIST_ROW.dump_all(games)
+
+        response = {
+            'games': game_lists,
+            'truncated': truncated
+        }
+        catalog_cache.set(cache_key, response, tags=['gamelists'])
+
+    return jsonify(response)
+
+
+@public.route('/api/gamelists/export')
+@catalog_etag
+def public_games_export():
+    # pylint: disable=maybe-no-member
+
+    after = request.args.get('after', 0, type=int)
+    games = db.session.query(*GAME_EXPORT_ROW.columns)\
+        .join(Vendor, Vendor.id == Game.vendor)\
+        .filter(Game.id > after)\
+        .order_by(Game.id)\
+        .yield_per(current_app.config['CATALOG_EXPORT_BATCH_SIZE'])
+
+    return stream_ndjson(GAME_EXPORT_ROW.dump(game) for game in games)
+
+
+@public.route('/api/gamelists/facets')
+@catalog_etag
+def public_games_facets():
+    # pylint: disable=maybe-no-member
+
+    filters = filter_args()
+    cache_key = request_cache_key(*FILTER_ARGS)
+    response = catalog_cache.get(cache_key)
+
+    if response is None:
+        truncated = False
+
+        if filters:
+            # narrowed facet is counted from at most FACET_MAX_GAMES filtered game (lowest id first),
+            # so broad filter doesn't unnest and group the whole catalog
+            clauses = array_filters(filters)
+            max_games = current_app.config['FACET_MAX_GAMES']
+            games = db.session.query(Game.id, Game.genre, Game.platform, Game.vendor)\
+                .filter(*clauses)\
+                .order_by(Game.id)\
+                .limit(max_games)\
+                .subquery()
+            game_facets = union_all(
+                select(games.c.id, literal('genre').label('facet'), func.unnest(games.c.genre).label('value')),
+                select(games.c.id, literal('platform'), func.unnest(games.c.platform)),
+                select(games.c.id, literal('vendor'), cast(games.c.vendor, String)),
+            ).subquery()
+            facets = select(game_facets.c.facet, game_facets.c.value, func.count(game_facets.c.id.distinct()).label('count'))\
+                .group_by(game_facets.c.facet, game_facets.c.value)\
+                .subquery()
+
+            truncated = db.session.query(Game.id)\
+                .filter(*clauses)\
+                .offset(max_games)\
+                .limit(1)\
+                .first() is not None
+
+        else:
+            facets = select(GameFacet.facet, GameFacet.value, GameFacet.count)\
+                .where(GameFacet.count > 0)\
+                .subquery()
+
+        # top FACET_LIMIT value of each facet, vendor name is joined to (at most FACET_LIMIT) vendor value only
+        position = func.row_number().over(partition_by=facets.c.facet, order_by=(facets.c.count.desc(), facets.c.value))
+        ranked = select(facets, position.label('position')).subquery()
+        vendor_id = case((ranked.c.facet == 'vendor', cast(ranked.c.value, Integer)))
+        facets = db.session.query(ranked.c.facet, ranked.c.value, ranked.c.count, Vendor.name)\
+            .select_from(ranked)\
+            .outerjoin(Vendor, and_(ranked.c.facet == 'vendor', Vendor.id == vendor_id))\
+            .filter(ranked.c.position <= current_app.config['FACET_LIMIT'])\
+            .order_by(ranked.c.facet, ranked.c.position)\
+            .all()
+
+        response = {
+            'genre': [{'name': value, 'count': count} for facet, value, count, _ in facets if facet == 'genre'],
+            'platform': [{'name': value, 'count': count} for facet, value, count, _ in facets if facet == 'platform'],
+            'vendor': [{
+                'vendor_id': int(value),
+                'name': name,
+                'count': count
+            } for facet, value, count, name in facets if facet == 'vendor'],
+            'truncated': truncated
+        }
+        catalog_cache.set(cache_key, response, tags=['gamelists'])
+
+    return jsonify(response)
+
+
+@public.route('/api/suggest')
+def public_suggest():
+    # popularity ranking change on user gamelist write that doesn't change catalog version,
+    # so suggestion has no etag and is only cached for CATALOG_CACHE_TTL
+    keyword = request.args.get('q', '').strip()
+
+    if not keyword or len(keyword) > SEARCH_MAX_LENGTH:
+        abort(422, 'Invalid search query')
+
+    cache_key = request_cache_key('q', 'limit')
+    response = catalog_cache.get(cache_key)
+
+    if response is None:
+        limit = min(request.args.get('limit', current_app.config['SUGGEST_LIMIT'], type=int), current_app.config['SUGGEST_LIMIT'])
+        response = {
+            'suggestions': suggest_index.search(keyword, max(limit, 1))
+        }
+        catalog_cache.set(cache_key, response, tags=['gamelists', 'vendors'])
+
+    return jsonify(response)
+
+
+@public.route('/api/leaderboard')
+def public_leaderboard():
+    # pylint: disable=maybe-no-member
+
+    rank = LEADERBOARD_RANKS.get(request.args.get('by', 'owned'))
 
-    games = db.session.query(Game, Vendor).join(Vendor).filter(Vendor.id == Game.vendor).all()
+    if rank is None:
+        abort(422, 'Invalid leaderboard')
 
-    for x in games:
-        game_lists.append({
-            'game_id': x[0].id,
-            'gameName': x[0].name,
-            'rating': x[0].rating,
-            'price': x[0].price,
-            'cover': x[0].cover_link,
-            'vendor': {
-                'name': x[1].name,
-                'distributor': x[1].distributor,
-            }
-        })
+    # ranking change on user gamelist write that doesn't change catalog version,
+    # so leaderboard is only cached for LEADERBOARD_TTL (and has no etag)
+    cache_key = request_cache_key('by')
+    response = catalog_cache.get(cache_key)
 
-    return jsonify({
-        'games': game_lists[start:end],
-        'total': len(game_lists)
-    })
+    if response is None:
+        games = db.session.query(*LEADERBOARD_ROW.columns)\
+            .select_from(GameRanking)\
+            .join(Game, Game.id == GameRanking.game)\
+            .join(Vendor, Vendor.id == Game.vendor)\
+            .filter(rank > 0)\
+            .order_by(rank.desc(), GameRanking.game.desc())\
+            .limit(current_app.config['LEADERBOARD_LIMIT'])\
+            .all()
+
+        response = {
+            'games': [{'rank': index + 1, **LEADERBOARD_ROW.dump(game)} for index, game in enumerate(games)]
+        }
+        catalog_cache.set(cache_key, response, ttl=current_app.config['LEADERBOARD_TTL'], tags=['gamelists'])
+
+    return jsonify(response)
 
 
 @public.route('/api/gamelist/<int:game_id>')
+@catalog_etag
 def public_game_detail(game_id):
     # pylint: disable=maybe-no-member
 
-    game = db.session.query(Game, Vendor)\
-        .join(Vendor)\
-        .filter(Game.id == game_id, Vendor.id == Game.vendor)\
-        .one_or_none()
-
-    if game:
-        return jsonify({
-            'gameName': game[0].name,
-            'rating': game[0].rating,
-            'price': game[0].price,
-            'genre': game[0].genre,
-            'platform': game[0].platform,
-            'cover': game[0].cover_link,
-            'releaseDate': game[1].release_date,
-            'vendor': {
-                'name': game[1].name,
-                'publisher': game[1].publisher,
-                'distributor': game[1].distributor,
-                'developer': game[1].developer,
-            }
-        })
-    else:
-        abort(404, 'No data founded')
+    row = request_fields(GAME_DETAIL_ROW)
+    cache_key = request_cache_key('fields')
+    response = catalog_cache.get(cache_key)
+
+    if response is None:
+        game = db.session.query(Vendor.id, *row.columns)\
+            .select_from(Game)\
+            .join(Vendor, Vendor.id == Game.vendor)\
+            .filter(Game.id == game_id)\
+            .one_or_none()
+
+        if not game:
+            abort(404, 'No data founded')
+
+        response = row.dump(game, 1)
+        catalog_cache.set(cache_key, response, tags=[f'game:{game_id}', f'vendor:{game[0]}'])
+
+    return jsonify(response)
 
 
 @public.route('/api/vendors')
+@catalog_etag
 def public_vendors():
+    # pylint: disable=maybe-no-member
+
+    ids = request_ids()
+
+    if ids is not None:
+        return public_vendors_batch(ids)
+
+    cache_key = request_cache_key('page', 'cursor')
+    response = catalog_cache.get(cache_key)
+
+    if response is None:
+        vendors = db.session.query(*VENDOR_LIST_ROW.columns)
+        vendors, cursor = page_or_cursor(vendors, [Vendor.id], lambda x: [x[0]], ITEM_LIMIT)
+        total = cached_count('vendors', db.session.query(func.count(Vendor.id)), tags=['vendors'])
 
-    vendor_lists = []
-    page = request.args.get('page', 1, type=int)
-    start = (page - 1) * ITEM_LIMIT
-    end = start + ITEM_LIMIT
+        vendor_lists = VENDOR_LIST_ROW.dump_all(vendors)
+
+        response = {
+            'vendors': vendor_lists,
+            'total': total,
+            **cursor
+        }
+        catalog_cache.set(cache_key, response, tags=['vendors'])
+
+    return jsonify(response)
+
+
+def public_vendors_batch(ids):
+    # pylint: disable=maybe-no-member
 
-    vendors = Vendor.query.all()
+    cache_key = request_cache_key('ids')
+    response = catalog_cache.get(cache_key)
 
-    for vendor in vendors:
-        vendor_lists.append({
-            'name': vendor.name,
-            'vendor_id': vendor.id
-        })
+    if response is None:
+        vendors = db.session.query(Vendor.id, *VENDOR_DETAIL_ROW.columns).filter(Vendor.id.in_(ids)).all()
+        vendors = {vendor[0]: {'vendor_id': vendor[0], **VENDOR_DETAIL_ROW.dump(vendor, 1)} for vendor in vendors}
 
-    return jsonify({
-        'vendors': vendor_lists[start:end],
-        'total': len(vendor_lists)
-    })
+        response = {
+            'vendors': [vendors[vendor_id] for vendor_id in ids if vendor_id in vendors],
+            'missing': [vendor_id for vendor_id in ids if vendor_id not in vendors]
+        }
+        catalog_cache.set(cache_key, response, tags=['vendors'])
+
+    return jsonify(response)
 
 
 @public.route('/api/vendor/<int:vendor_id>')
+@catalog_etag
 def public_vendor_detail(vendor_id):
-    vendor = Vendor.query.filter(Vendor.id == vendor_id).one_or_none()
-
-    if vendor:
-        return jsonify({
-            'name': vendor.name,
-            'publisher': vendor.publisher,
-            'distributor': vendor.distributor,
-            'developer': vendor.developer,
-            'games': [{'game': game.name, 'id': game.id, 'cover': game.cover_link} for game in vendor.game_lists]
-        })
-
-    else:
-        abort(404, 'No data founded')
+    # pylint: disable=maybe-no-member
+
+    cache_key = request_cache_key('page')
+    response = catalog_cache.get(cache_key)
+
+    if response is None:
+        page = max(request.args.get('page', 1, type=int), 1)
+        limit = current_app.config['VENDOR_GAMES_LIMIT']
+
+        # one page of vendor games with total count (window function) joined to vendor row,
+        # so vendor, games and total come back in a single query
+        games = db.session.query(Game.id, Game.name, Game.cover_link, func.count().over().label('total'))\
+            .filter(Game.vendor == vendor_id)\
+            .order_by(Game.id)\
+            .limit(limit)\
+            .offset((page - 1) * limit)\
+            .subquery()
+        rows = db.session.query(*VENDOR_DETAIL_ROW.columns, games.c.id, games.c.name, games.c.cover_link, games.c.total)\
+            .outerjoin(games, true())\
+            .filter(Vendor.id == vendor_id)\
+            .order_by(games.c.id)\
+            .all()
+
+        if not rows:
+            abort(404, 'No data founded')
+
+        offset = len(VENDOR_DETAIL_ROW.columns)
+        total = rows[0][offset + 3]
+
+        # requested page is past the last game, count separately
+        if total is None:
+            total = db.session.query(func.count(Game.id)).filter(Game.vendor == vendor_id).scalar()
+
+        response = {
+            **VENDOR_DETAIL_ROW.dump(rows[0]),
+            'games': [{
+                'game': row[offset + 1],
+                'id': row[offset],
+                'cover': row[offset + 2]
+            } for row in rows if row[offset] is not None],
+            'totalGames': total
+        }
+        catalog_cache.set(cache_key, response, tags=[f'vendor:{vendor_id}'])
+
+    return jsonify(response)
@@ -4,7 +4,14 @@ from flask import Blueprint
 from flask import jsonify
 from flask import request
 from flask import abort
-
+from sqlalchemy import func
+
+from .controller_helper import page_or_cursor
+from .controller_helper import library_page
+from .controller_helper import RowSerializer
+from .controller_helper import request_fields
+from .controller_helper import array_filters
+from .controller_helper import filter_args
 from .controller_helper import authenticate
 from .controller_helper import authorize
 
@@ -12,6 +19,7 @@ from model import MyGame
 from model import Vendor
 from model import User
 from model import Game
+from shared import db
 
 user = Blueprint('user_endpoint', __name__)
 ITEM_LIMIT = 10
@@ -19,25 +27,28 @@ ITEM_LIMIT = 10
 # set cors in blueprint level
 CORS(user)
 
+# list response row shape
+MY_GAME_ROW = RowSerializer(
+    list_id=MyGame.id,
+    game_id=Game.id,
+    name=Game.name,
+    platform=Game.platform,
+    genres=Game.genre,
+    cover=Game.cover_link,
+    vendor=RowSerializer(
+        vendor_id=Vendor.id,
+        name=Vendor.name,
+        distributor=Vendor.distributor,
+    )
+)
+
 
 @user.route('/api/user/me')
 @authenticate
 @authorize(permission='get:me')
 def user_index(user_id):
     user = User.query.get(user_id)
-    my_games_id = [game.id for game in user.my_game]
-    my_gamelist = MyGame.query.join(Vendor, Game).filter(MyGame.id.in_(my_games_id)).all()
-
-    games = [{
-        'list_id': game.id,
-        'game_id': game.Game.id,
-        'name': game.Game.name,
-        'cover': game.Game.cover_link,
-        'vendor': {
-            'vendor_id': game.Vendor.id,
-            'name': game.Vendor.name,
-            'distributor': game.Vendor.distributor
-        }} for game in my_gamelist]
+    games, total, cursor = library_page(user_id, ITEM_LIMIT)
 
     return jsonify({
         'username': user.username,
@@ -45,7 +56,8 @@ def user_index(user_id):
         'avatar': user.picture,
         'game': {
             'games': games,
-            'totalGame': len(user.my_game)
+            'totalGame': total,
+            **cursor
         }
     })
 
@@ -56,28 +68,28 @@ def user_index(user_id):
 @authorize(permission='post:my-game')
 def user_gamelist(user_id):
     if request.method == 'GET':
-        games = MyGame.query.join(Vendor, Game).filter(MyGame.owner == user_id).all()
-        page = request.args.get('page', 1, type=int)
-        start = (page - 1) * ITEM_LIMIT
-        end = start + ITEM_LIMIT
-
-        my_game_lists = [{
-            'list_id': game.id,
-            'game_id': game.Game.id,
-            'name': game.Game.name,
-            'platform': game.Game.platform,
-            'genres': game.Game.genre,
-            'cover': game.Game.cover_link,
-            'vendor': {
-                'vendor_id': game.Vendor.id,
-                'name': game.Vendor.name,
-                'distributor': game.Vendor.distributor
-            }
-        } for game in games]
+        clauses = array_filters(filter_args())
+        row = request_fields(MY_GAME_ROW)
+        games = db.session.query(MyGame.id, *row.columns)\
+            .select_from(MyGame)\
+            .join(MyGame.Game)\
+            .join(MyGame.Vendor)\
+            .filter(MyGame.owner == user_id, *clauses)
+        games, cursor = page_or_cursor(games, [MyGame.id], lambda x: [x[0]], ITEM_LIMIT)
+        total = db.session.query(func.count(MyGame.id))\
+            .filter(MyGame.owner == user_id)
+
+        if clauses:
+            total = total.join(MyGame.Game).filter(*clauses)
+
+        total = total.scalar()
+
+        my_game_lists = row.dump_all(games, 1)
 
         return jsonify({
-            'myGames': my_game_lists[start:end],
-            'totalGames': len(my_game_lists)
+            'myGames': my_game_lists,
+            'totalGames': total,
+            **cursor
         })
 
     elif request.method == 'POST':
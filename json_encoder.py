@@ -0,0 +1,58 @@
+"""
+JSON encoder helper
+"""
+from flask.json import JSONEncoder
+from flask import has_app_context
+from flask import current_app
+from flask import stream_with_context
+from flask import json
+
+try:
+    import orjson
+
+except ImportError:
+    orjson = None
+
+
+class AppJSONEncoder(JSONEncoder):
+    """
+    App JSON encoder
+
+    encode with orjson when it is installed and enabled with JSON_ENCODER config,
+    otherwise (or when orjson refuse the value) fallback to stdlib encoder.
+    datetime is kept in http date format (as stdlib encoder do) unless
+    JSON_DATETIME_FORMAT config is set to iso, then it is encoded natively by orjson.
+    """
+    def encode(self, o):
+        config = current_app.config if has_app_context() else {}
+
+        if orjson is None or config.get('JSON_ENCODER', 'orjson') != 'orjson':
+            return super().encode(o)
+
+        option = orjson.OPT_NON_STR_KEYS
+
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+
+        if self.indent:
+            option |= orjson.OPT_INDENT_2
+
+        if config.get('JSON_DATETIME_FORMAT', 'http') != 'iso':
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+
+        try:
+            return orjson.dumps(o, default=self.default, option=option).decode()
+
+        except TypeError:
+            return super().encode(o)
+
+
+def stream_ndjson(items):
+    """
+    stream iterable as newline delimited json (one json document per line) chunked response
+    """
+    def generate():
+        for item in items:
+            yield f'{json.dumps(item)}\n'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -0,0 +1,31 @@
+"""unbounded game facet value
+
+Revision ID: 202271efb56a
+Revises: 205c22ca1a01
+Create Date: 2026-10-18 20:44:26.855453
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202271efb56a'
+down_revision = '205c22ca1a01'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # facet value hold genre / platform (unbounded text array element) and vendor id
+    op.alter_column('GameFacet', 'value',
+               existing_type=sa.String(length=150),
+               type_=sa.String(),
+               existing_nullable=False)
+
+
+def downgrade():
+    op.alter_column('GameFacet', 'value',
+               existing_type=sa.String(),
+               type_=sa.String(length=150),
+               existing_nullable=False)
@@ -1,10 +1,16 @@
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
 from .model_helper import random_id_generator
+from shared import catalog_cache
 from shared import db
 
 
 class Vendor(db.Model):
     # pylint: disable=maybe-no-member
     __tablename__ = 'Vendor'
+    __table_args__ = (
+        db.Index('ix_Vendor_release_date_id', 'release_date', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False, unique=True)
@@ -28,13 +34,20 @@ class Vendor(db.Model):
     def add(self):
         db.session.add(self)
         db.session.commit()
+        self.invalidate()
 
     def update(self):
         db.session.commit()
+        self.invalidate()
 
     def remove(self):
         db.session.delete(self)
         db.session.commit()
+        self.invalidate()
+
+    def invalidate(self):
+        # vendor name is embedded in game list and game detail
+        catalog_cache.invalidate('vendors', 'gamelists', f'vendor:{self.id}')
 
     def get(self):
         return {
@@ -50,6 +63,15 @@ class Vendor(db.Model):
 class Game(db.Model):
     # pylint: disable=maybe-no-member
     __tablename__ = 'Game'
+    __table_args__ = (
+        db.Index('ix_Game_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_Game_platform', 'platform', postgresql_using='gin'),
+        db.Index('ix_Game_genre', 'genre', postgresql_using='gin'),
+        db.Index('ix_Game_rating_id', 'rating', 'id'),
+        db.Index('ix_Game_price_id', 'price', 'id'),
+        db.Index('ix_Game_name_id', 'name', 'id'),
+        db.Index('ix_Game_vendor_id', 'vendor', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
@@ -60,6 +82,9 @@ class Game(db.Model):
     cover_link = db.Column(db.String(200), nullable=True)
     vendor = db.Column(db.Integer, db.ForeignKey('Vendor.id'), nullable=False)
 
+    # full-text search document (name, vendor name and genre), maintained by database trigger
+    search_vector = db.deferred(db.Column(TSVECTOR, nullable=True))
+
     # relationship
     my_game = db.relationship('MyGame', backref='Game', lazy=True, cascade='all, delete-orphan')
 
@@ -76,13 +101,20 @@ class Game(db.Model):
     def add(self):
         db.session.add(self)
         db.session.commit()
+        self.invalidate()
 
     def update(self):
         db.session.commit()
+        self.invalidate()
 
     def remove(self):
         db.session.delete(self)
         db.session.commit()
+        self.invalidate()
+
+    def invalidate(self):
+        # game is embedded in its vendor detail
+        catalog_cache.invalidate('gamelists', f'game:{self.id}', f'vendor:{self.vendor}')
 
     def get(self):
         return {
@@ -100,6 +132,9 @@ class Game(db.Model):
 class MyGame(db.Model):
     # pylint: disable=maybe-no-member
     __tablename__ = 'Mygame'
+    __table_args__ = (
+        db.Index('ix_Mygame_owner_id', 'owner', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     owner = db.Column(db.String, db.ForeignKey('Auth0user.id'), nullable=False)
@@ -150,6 +185,53 @@ class User(db.Model):
     my_game = db.relationship('MyGame', backref='User', lazy=True, cascade='all, delete-orphan')
 
 
+class CatalogVersion(db.Model):
+    # pylint: disable=maybe-no-member
+    __tablename__ = 'CatalogVersion'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=1)
+
+    @classmethod
+    def get(cls):
+        catalog = cls.query.get(1)
+        return catalog.version if catalog else 0
+
+    @classmethod
+    def bump(cls):
+        version = db.session.execute(
+            db.update(cls).where(cls.id == 1).values(version=cls.version + 1).returning(cls.version)
+        ).scalar()
+        db.session.commit()
+        return version
+
+
+class GameFacet(db.Model):
+    # pylint: disable=maybe-no-member
+    __tablename__ = 'GameFacet'
+
+    # number of game per genre, platform and vendor (vendor id as value),
+    # maintained by database trigger on every game write
+    facet = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.String, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class GameRanking(db.Model):
+    # pylint: disable=maybe-no-member
+    __tablename__ = 'GameRanking'
+    __table_args__ = (
+        db.Index('ix_GameRanking_owners_game', 'owners', 'game'),
+        db.Index('ix_GameRanking_players_game', 'players', 'game'),
+    )
+
+    # number of user owning (and playing) a game,
+    # maintained by database trigger on every user gamelist write
+    game = db.Column(db.Integer, db.ForeignKey('Game.id', ondelete='CASCADE'), primary_key=True)
+    owners = db.Column(db.Integer, nullable=False, default=0)
+    players = db.Column(db.Integer, nullable=False, default=0)
+
+
 class SystemAuthKey(db.Model):
     # pylint: disable=maybe-no-member
     __tablename__ = 'sysAuth0TokenStorage'
@@ -157,13 +239,16 @@ class SystemAuthKey(db.Model):
     id = db.Column(db.String(200), primary_key=True, nullable=False, default=random_id_generator)
     token = db.Column(db.String, nullable=False)
     expiration = db.Column(db.DateTime, nullable=False)
+    # management api audience (Auth0 tenant) the token is minted for
+    audience = db.Column(db.String, nullable=False)
 
     def __repr__(self):
         return str(f'{self.expiration}')
 
-    def __init__(self, token, expiration):
+    def __init__(self, token, expiration, audience):
         self.token = token
         self.expiration = expiration
+        self.audience = audience
 
     def save(self):
         db.session.add(self)
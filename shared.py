@@ -1,4 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 
+from cache import LRUCache
+
 
 db = SQLAlchemy()
+
+# verified Auth0 token payload, keyed by token hash
+token_cache = LRUCache()
+
+# resolved user profile, keyed by Auth0 user id (token sub)
+profile_cache = LRUCache()
+
+# public catalog response and total count, tagged by catalog entity
+catalog_cache = LRUCache()
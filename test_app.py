@@ -1,8 +1,45 @@
 from dotenv import dotenv_values
 from app import init_app
+import multiprocessing
 import unittest
+import threading
+import datetime
+import time
 import json
 
+from auth0_local import MANAGER_PERMISSIONS
+from auth0_local import USER_PERMISSIONS
+from auth0_local import local_tenant
+from auth0_local import LocalAuth0
+from controller.controller_helper import Auth0UserProfile
+from controller.controller_helper import management_token
+from controller.controller_helper import ServerError
+from controller.controller_helper import http_client
+from model import SystemAuthKey
+from shared import catalog_cache
+from shared import db
+from sqlalchemy import text
+
+# Auth0 user used when test token is not provided in .env
+USER_SUB = 'auth0|61470d6d44672c00694cfd14'
+MANAGER_SUB = 'auth0|6148a3d1f2b4d7006a3c5e21'
+
+
+def worker_management_token(latency):
+    """
+    worker process of cross-worker management token test, return its token and number of oauth/token call
+    """
+    app = init_app()
+    # worker only need oauth/token, small key keep process start fast
+    auth0 = LocalAuth0(key_size=512)
+    auth0.install(app)
+    auth0.token_latency = latency
+
+    with app.app_context():
+        token = management_token.get()
+
+    return token, http_client.metrics().get('oauth_token', {}).get('count', 0)
+
 
 class MyGameListTestCase(unittest.TestCase):
     def setUp(self):
@@ -11,6 +48,13 @@ class MyGameListTestCase(unittest.TestCase):
         self.user_token = dotenv_values('.env').get('USER_TEST')
         self.manager_token = dotenv_values('.env').get('MANAGER_TEST')
 
+        # no real Auth0 token, use offline Auth0 stand-in instead
+        if not (self.user_token and self.manager_token):
+            auth0 = local_tenant()
+            auth0.install(self.app)
+            self.user_token = auth0.mint_token(USER_SUB, USER_PERMISSIONS)
+            self.manager_token = auth0.mint_token(MANAGER_SUB, MANAGER_PERMISSIONS)
+
         # set imagelink to self.imagelink because line too long
         # and resulting pylint error variable value too long
         self.imglink = 'https://img2.storyblok.com/fit-in/0x1000/filters:format(webp)/\
@@ -31,6 +75,238 @@ class MyGameListTestCase(unittest.TestCase):
         self.assertEqual(status, 200)
         self.assertIsInstance(test.get('games'), list)
 
+    def test_get_gamelist_cursor(self):
+        """
+        Public endpoint /api/gamelists cursor mode operation get test
+        """
+        response = self.client().get('http://localhost:8000/api/gamelists?cursor=')
+        status = response.status_code
+        test = json.loads(response.data)
+
+        next_response = self.client().get(f'http://localhost:8000/api/gamelists?cursor={test.get("next")}')
+        next_test = json.loads(next_response.data)
+
+        print('\n[*] Testing /api/gamelists?cursor= endpoint (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertIsInstance(test.get('games'), list)
+        self.assertIn('next', test)
+        self.assertEqual(next_response.status_code, 200)
+        self.assertNotIn(test.get('games')[-1], next_test.get('games'))
+
+    def test_get_gamelist_unknown_parameter(self):
+        """
+        Public endpoint /api/gamelists with unknown query parameter doesn't add cache entry test
+        """
+        self.client().get('http://localhost:8000/api/gamelists?page=2')
+        cached = len(catalog_cache)
+
+        response = self.client().get('http://localhost:8000/api/gamelists?page=2&x=1')
+        other_response = self.client().get('http://localhost:8000/api/gamelists?page=2&x=2')
+
+        print('\n[*] Testing /api/gamelists endpoint with unknown parameter (operation::GET)\n ')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(other_response.status_code, 200)
+        self.assertEqual(len(catalog_cache), cached)
+
+    def test_get_gamelist_invalid_cursor(self):
+        """
+        Public endpoint /api/gamelists cursor mode with mistyped cursor get test
+        """
+        # base64 of ["a"], valid json but not a game id
+        response = self.client().get('http://localhost:8000/api/gamelists?cursor=WyJhIl0=')
+        status = response.status_code
+
+        print('\n[*] Testing /api/gamelists?cursor= endpoint with invalid cursor (operation::GET)\n ')
+        self.assertEqual(status, 422)
+
+    def test_get_gamelist_not_modified(self):
+        """
+        Public endpoint /api/gamelists conditional get test
+        """
+        response = self.client().get('http://localhost:8000/api/gamelists')
+        etag = response.headers.get('ETag')
+
+        cached_response = self.client().get('http://localhost:8000/api/gamelists', headers={'If-None-Match': etag})
+        status = cached_response.status_code
+
+        print('\n[*] Testing /api/gamelists endpoint (operation::GET If-None-Match)\n ')
+        self.assertIsNotNone(etag)
+        self.assertEqual(status, 304)
+        self.assertEqual(cached_response.data, b'')
+
+    def test_get_gamelist_filter(self):
+        """
+        Public endpoint /api/gamelists genre and platform filter operation get test
+        """
+        response = self.client().get('http://localhost:8000/api/gamelists?genre=RPG,Action&platform=Linux')
+        status = response.status_code
+        test = json.loads(response.data)
+
+        invalid_response = self.client().get('http://localhost:8000/api/gamelists?genre=RPG&genre_match=some')
+
+        print('\n[*] Testing /api/gamelists?genre=&platform= endpoint (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertIsInstance(test.get('games'), list)
+        self.assertEqual(invalid_response.status_code, 422)
+
+    def test_get_gamelist_sort(self):
+        """
+        Public endpoint /api/gamelists sort operation get test
+        """
+        response = self.client().get('http://localhost:8000/api/gamelists?sort=-price')
+        status = response.status_code
+        test = json.loads(response.data)
+        prices = [game.get('price') for game in test.get('games')]
+
+        invalid_response = self.client().get('http://localhost:8000/api/gamelists?sort=password')
+
+        print('\n[*] Testing /api/gamelists?sort= endpoint (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertEqual(prices, sorted(prices, reverse=True))
+        self.assertEqual(invalid_response.status_code, 422)
+
+    def test_get_gamelist_fields(self):
+        """
+        Public endpoint /api/gamelists sparse fieldset operation get test
+        """
+        response = self.client().get('http://localhost:8000/api/gamelists?fields=game_id,gameName,cover')
+        status = response.status_code
+        test = json.loads(response.data)
+
+        invalid_response = self.client().get('http://localhost:8000/api/gamelists?fields=game_id,password')
+
+        print('\n[*] Testing /api/gamelists?fields= endpoint (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertEqual(set(test.get('games')[0]), {'game_id', 'gameName', 'cover'})
+        self.assertEqual(invalid_response.status_code, 422)
+
+    def test_get_gamelist_facets(self):
+        """
+        Public endpoint /api/gamelists/facets operation get test
+        """
+        response = self.client().get('http://localhost:8000/api/gamelists/facets')
+        status = response.status_code
+        test = json.loads(response.data)
+
+        filtered_response = self.client().get('http://localhost:8000/api/gamelists/facets?genre=RPG')
+        filtered_test = json.loads(filtered_response.data)
+        filtered_genre = {genre.get('name'): genre.get('count') for genre in filtered_test.get('genre')}
+
+        gamelist_response = self.client().get('http://localhost:8000/api/gamelists?genre=RPG')
+        gamelist_test = json.loads(gamelist_response.data)
+
+        print('\n[*] Testing /api/gamelists/facets endpoint (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertIsInstance(test.get('genre'), list)
+        self.assertIsInstance(test.get('platform'), list)
+        self.assertIsInstance(test.get('vendor'), list)
+        self.assertFalse(test.get('truncated'))
+        self.assertIn('RPG', filtered_genre)
+        self.assertEqual(filtered_genre.get('RPG'), gamelist_test.get('total'))
+
+    def test_get_gamelist_facets_truncated(self):
+        """
+        Public endpoint /api/gamelists/facets with bounded filtered game operation get test
+        """
+        self.app.config['FACET_MAX_GAMES'] = 2
+        self.app.config['FACET_LIMIT'] = 1
+
+        response = self.client().get('http://localhost:8000/api/gamelists/facets?platform=Windows,Linux,PS5,Switch')
+        status = response.status_code
+        test = json.loads(response.data)
+
+        print('\n[*] Testing /api/gamelists/facets endpoint with truncated result (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertTrue(test.get('truncated'))
+        self.assertLessEqual(len(test.get('vendor')), 1)
+        self.assertTrue(all(vendor.get('count') <= 2 for vendor in test.get('vendor')))
+
+    def test_get_gamelist_search(self):
+        """
+        Public endpoint /api/gamelists/search operation get test
+        """
+        response = self.client().get('http://localhost:8000/api/gamelists/search?q=title')
+        status = response.status_code
+        test = json.loads(response.data)
+
+        empty_response = self.client().get('http://localhost:8000/api/gamelists/search?q=')
+
+        print('\n[*] Testing /api/gamelists/search endpoint (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertIsInstance(test.get('games'), list)
+        self.assertFalse(test.get('truncated'))
+        self.assertEqual(empty_response.status_code, 422)
+
+    def test_get_gamelist_search_truncated(self):
+        """
+        Public endpoint /api/gamelists/search with bounded candidate operation get test
+        """
+        self.app.config['SEARCH_MAX_CANDIDATES'] = 12
+
+        response = self.client().get('http://localhost:8000/api/gamelists/search?q=game')
+        status = response.status_code
+        test = json.loads(response.data)
+
+        next_response = self.client().get('http://localhost:8000/api/gamelists/search?q=game&page=2')
+        next_test = json.loads(next_response.data)
+
+        games = [game.get('game_id') for game in test.get('games') + next_test.get('games')]
+
+        print('\n[*] Testing /api/gamelists/search endpoint with truncated result (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertTrue(test.get('truncated'))
+        self.assertEqual(len(games), len(set(games)))
+        self.assertLessEqual(len(games), 12)
+
+    def test_get_gamelist_export(self):
+        """
+        Public endpoint /api/gamelists/export operation get test
+        """
+        response = self.client().get('http://localhost:8000/api/gamelists/export')
+        status = response.status_code
+        test = [json.loads(line) for line in response.data.splitlines()]
+
+        resume_response = self.client().get(f'http://localhost:8000/api/gamelists/export?after={test[0].get("game_id")}')
+        resume_test = [json.loads(line) for line in resume_response.data.splitlines()]
+
+        print('\n[*] Testing /api/gamelists/export endpoint (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertIsInstance(test[0].get('vendor'), dict)
+        self.assertEqual(resume_test, test[1:])
+
+    def test_get_gamelist_batch(self):
+        """
+        Public endpoint /api/gamelists batch operation get test
+        """
+        games = json.loads(self.client().get('http://localhost:8000/api/gamelists?sort=-price').data).get('games')
+        ids = [game.get('game_id') for game in games[:2]]
+
+        response = self.client().get(f'http://localhost:8000/api/gamelists?ids={ids[0]},{ids[1]},99999')
+        status = response.status_code
+        test = json.loads(response.data)
+
+        print('\n[*] Testing /api/gamelists?ids= endpoint (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertEqual([game.get('game_id') for game in test.get('games')], ids)
+        self.assertEqual(test.get('missing'), [99999])
+
+    def test_get_suggest(self):
+        """
+        Public endpoint /api/suggest operation get test
+        """
+        response = self.client().get('http://localhost:8000/api/suggest?q=GAM')
+        status = response.status_code
+        test = json.loads(response.data)
+
+        empty_response = self.client().get('http://localhost:8000/api/suggest?q=')
+
+        print('\n[*] Testing /api/suggest endpoint (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertIsInstance(test.get('suggestions'), list)
+        self.assertTrue(all('gam' in suggestion.get('name').lower() for suggestion in test.get('suggestions')))
+        self.assertEqual(empty_response.status_code, 422)
+
     def test_get_game_detail(self):
         """
         Public endpoint /api/gamelist/<id> operation get test
@@ -43,6 +319,22 @@ class MyGameListTestCase(unittest.TestCase):
         self.assertEqual(status, 200)
         self.assertIsInstance(test, object)
 
+    def test_get_game_detail_fields(self):
+        """
+        Public endpoint /api/gamelist/<id> sparse fieldset operation get test
+        """
+        response = self.client().get('http://localhost:8000/api/gamelist/6?fields=vendor')
+        status = response.status_code
+        test = json.loads(response.data)
+
+        release_response = self.client().get('http://localhost:8000/api/gamelist/6?fields=releaseDate')
+
+        print('\n[*] Testing /api/gamelist/<id>?fields= endpoint (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertEqual(set(test), {'vendor'})
+        self.assertEqual(release_response.status_code, 200)
+        self.assertEqual(set(json.loads(release_response.data)), {'releaseDate'})
+
     def test_get_vendors(self):
         """
         Public endpoint /api/vendors operation get test
@@ -66,6 +358,24 @@ class MyGameListTestCase(unittest.TestCase):
         print('\n[*] Testing /api/vendor/<id> endpoint (operation::GET)\n ')
         self.assertEqual(status, 200)
         self.assertIsInstance(test, object)
+        self.assertIsInstance(test.get('games'), list)
+        self.assertIsInstance(test.get('totalGames'), int)
+
+    def test_get_leaderboard(self):
+        """
+        Public endpoint /api/leaderboard operation get test
+        """
+        response = self.client().get('http://localhost:8000/api/leaderboard')
+        status = response.status_code
+        test = json.loads(response.data)
+        owners = [game.get('owners') for game in test.get('games')]
+
+        invalid_response = self.client().get('http://localhost:8000/api/leaderboard?by=rating')
+
+        print('\n[*] Testing /api/leaderboard endpoint (operation::GET)\n ')
+        self.assertEqual(status, 200)
+        self.assertEqual(owners, sorted(owners, reverse=True))
+        self.assertEqual(invalid_response.status_code, 422)
 
     def test_get_my_info(self):
         """
@@ -83,6 +393,8 @@ class MyGameListTestCase(unittest.TestCase):
         print('\n[*] Testing /api/user/me endpoint (operation::GET)\n ')
         self.assertEqual(status, 200)
         self.assertIsInstance(test, object)
+        self.assertLessEqual(len(test.get('game').get('games')), 10)
+        self.assertGreaterEqual(test.get('game').get('totalGame'), len(test.get('game').get('games')))
 
     def test_get_my_game(self):
         """
@@ -428,6 +740,137 @@ class MyGameListTestCase(unittest.TestCase):
         """
         pass
 
+    def test_management_token_audience(self):
+        """
+        Auth0 management token minted for other audience (Auth0 tenant) is not reused test
+        """
+        expiration = datetime.datetime.now() + datetime.timedelta(days=2)
+
+        with self.app.app_context():
+            SystemAuthKey('other-tenant-token', expiration, 'https://other.auth0.com/api/v2/').save()
+            management_token.clear()
+            token = management_token.get()
+
+        print('\n[*] Testing Auth0 management token storage audience\n ')
+        self.assertNotEqual(token, 'other-tenant-token')
+
+    def test_management_token_rejected(self):
+        """
+        Auth0 management token rejected by Auth0 is dropped and minted again test
+        """
+        expiration = datetime.datetime.now() + datetime.timedelta(days=2)
+
+        with self.app.app_context():
+            SystemAuthKey('revoked-token', expiration, self.app.config.get('AUTH0_SYSTEM_AUDIENCE')).save()
+            management_token.clear()
+
+            with self.assertRaises(ServerError):
+                Auth0UserProfile(USER_SUB)
+
+            stored = SystemAuthKey.query.filter(SystemAuthKey.token == 'revoked-token').count()
+            profile = Auth0UserProfile(USER_SUB)
+
+        print('\n[*] Testing Auth0 management token rejection\n ')
+        self.assertEqual(stored, 0)
+        self.assertEqual(profile.get('user_id'), USER_SUB.split('|', 1)[-1])
+
+    def test_management_token_single_flight(self):
+        """
+        concurrent Auth0 management token request at expiration is collapsed into single oauth/token call test
+        """
+        self.local_auth0(latency=0.2)
+        minted = self.oauth_token_calls()
+        tokens = self.concurrent_management_token(8)
+
+        print('\n[*] Testing Auth0 management token single-flight mint\n ')
+        self.assertEqual(len(tokens), 8)
+        self.assertEqual(len(set(tokens)), 1)
+        self.assertEqual(self.oauth_token_calls() - minted, 1)
+
+    def test_management_token_refresh_margin(self):
+        """
+        Auth0 management token within refresh margin is returned at once and refreshed once in background test
+        """
+        self.local_auth0(latency=0.2)
+        self.concurrent_management_token(1)
+
+        # every token (valid for 24 hours) is now within refresh margin
+        self.app.config['AUTH0_TOKEN_REFRESH_MARGIN'] = 86400 + 60
+        minted = self.oauth_token_calls()
+
+        started = time.perf_counter()
+        tokens = self.concurrent_management_token(8)
+        elapsed = time.perf_counter() - started
+
+        deadline = time.time() + 5
+        while self.oauth_token_calls() == minted and time.time() < deadline:
+            time.sleep(0.05)
+
+        # leave time for a second (unwanted) refresh to show up
+        time.sleep(0.3)
+
+        print('\n[*] Testing Auth0 management token background refresh\n ')
+        self.assertEqual(len(set(tokens)), 1)
+        self.assertLess(elapsed, 0.2)
+        self.assertEqual(self.oauth_token_calls() - minted, 1)
+
+    def test_management_token_cross_worker(self):
+        """
+        Auth0 management token is minted once for every worker process, the others reuse it test
+        """
+        self.local_auth0()
+
+        with multiprocessing.get_context('spawn').Pool(4) as pool:
+            results = pool.map(worker_management_token, [0.5] * 4)
+
+            # worker (and its pooled connection) is still alive, minting lock must be released already
+            with self.app.app_context():
+                advisory_locks = db.session.execute(text("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory'")).scalar()
+
+        print('\n[*] Testing Auth0 management token cross-worker mint\n ')
+        self.assertEqual(len({token for token, _ in results}), 1)
+        self.assertEqual(sum(calls for _, calls in results), 1)
+        self.assertEqual(advisory_locks, 0)
+
+    def local_auth0(self, latency=0):
+        """
+        route Auth0 traffic to the offline stand-in with slow oauth/token, and forget current management token
+        """
+        auth0 = local_tenant()
+        auth0.install(self.app)
+        auth0.token_latency = latency
+        self.addCleanup(setattr, auth0, 'token_latency', 0)
+
+        with self.app.app_context():
+            SystemAuthKey.query.filter(SystemAuthKey.audience == self.app.config.get('AUTH0_SYSTEM_AUDIENCE')).delete()
+            SystemAuthKey.query.session.commit()
+            management_token.clear()
+
+        return auth0
+
+    def concurrent_management_token(self, count):
+        tokens = []
+        barrier = threading.Barrier(count)
+
+        def get_token():
+            with self.app.app_context():
+                barrier.wait()
+                tokens.append(management_token.get())
+
+        threads = [threading.Thread(target=get_token) for _ in range(count)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        return tokens
+
+    @staticmethod
+    def oauth_token_calls():
+        return http_client.metrics().get('oauth_token', {}).get('count', 0)
+
 
 if __name__ == '__main__':
     unittest.main()